@@ -1,25 +1,94 @@
 import ast
+import os
 import pickle
 
-import matplotlib.pyplot as plt
 import pandas as pd
 import seaborn as sns
-from ipyleaflet import Icon, Map, Marker
-from ipywidgets import HTML
+from matplotlib.figure import Figure
 from shiny import App, reactive, render, ui
 from shinywidgets import output_widget, render_widget
-
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Mount, Route
+
+from modern_data_analytics.config import (
+    ARTIFACT_POLL_INTERVAL_S,
+    ARTIFACTS_DIR,
+    ENCODER_NUM_THREADS,
+    METRICS_LOG_INTERVAL_S,
+    SESSION_CACHE_SIZE,
+    SESSION_WIDGET_CACHE_SIZE,
+    TUNE_THREADS,
+)
+from modern_data_analytics.instrumentation import METRICS, start_periodic_log_summary, timed
+from modern_data_analytics.profiling import PROFILER
 from modern_data_analytics.recommender import Recommender
+from modern_data_analytics.recommender.artifacts import ArtifactWatcher
+from modern_data_analytics.recommender.backends import configure_threads
+from modern_data_analytics.recommender.collaborators import CollaboratorIndex
+from modern_data_analytics.serving import (
+    MatchSetStats,
+    PartnerMap,
+    SessionCache,
+    build_marker,
+    build_marker_layer,
+    build_partner_layer,
+    load_serving_tables,
+)
+
+# Load slim serving tables; long objective texts are fetched from disk on demand
+project_data, org_data, objective_store, topic_objective_store = load_serving_tables("data/serving")
 
-# Load project data
-project_data = pd.read_csv("data/processed/project_merged.csv")
-org_data = pd.read_csv("data/processed/org_unique_detailed.csv")
+# Tune torch's thread pools once for the whole process, before the encoder first runs
+if TUNE_THREADS:
+    configure_threads(ENCODER_NUM_THREADS)
 
-# Load embeddings to Recommender
-with open("models/project_ids.pkl", "rb") as f:
-    project_ids = pickle.load(f)
+# Load embeddings to Recommender from the current artifact version, falling back to the unversioned files
 recommender = Recommender()
-recommender.load_pretrained_project_embeddings(project_ids, "models/project_embeddings.npy")
+# BM25 index fused with the dense ranking, an optional preprocessing output (lexical_index_path); dense-only without it
+LEXICAL_INDEX_PATH = "models/lexical_index.npz"
+if os.path.exists(LEXICAL_INDEX_PATH):
+    recommender.load_lexical_index(LEXICAL_INDEX_PATH)
+artifact_watcher = ArtifactWatcher(ARTIFACTS_DIR, recommender)
+if not artifact_watcher.check():
+    with open("models/project_ids.pkl", "rb") as f:
+        project_ids = pickle.load(f)
+    recommender.load_pretrained_project_embeddings(project_ids, "models/project_embeddings.npy")
+    # Organisation embeddings are optional, built by mda-build-org-embeddings
+    if os.path.exists("models/org_ids.pkl") and os.path.exists("models/org_embeddings.npy"):
+        with open("models/org_ids.pkl", "rb") as f:
+            org_ids = pickle.load(f)
+        recommender.load_pretrained_organisation_embeddings(org_ids, "models/org_embeddings.npy")
+
+# Swap newly published versions in the background, in-flight queries finish on the previous one
+if ARTIFACT_POLL_INTERVAL_S > 0:
+    artifact_watcher.start()
+
+# Load organisation co-participation graph, an optional preprocessing output (graph_path)
+COPARTICIPATION_GRAPH_PATH = "models/coparticipation_graph.npz"
+collaborator_index = None
+if os.path.exists(COPARTICIPATION_GRAPH_PATH):
+    collaborator_index = CollaboratorIndex(COPARTICIPATION_GRAPH_PATH)
+
+# Load precomputed project feature cube for match-set statistics, an optional preprocessing output (cube_path)
+FEATURE_CUBE_PATH = "models/project_feature_cube.npz"
+match_stats = None
+if os.path.exists(FEATURE_CUBE_PATH):
+    match_stats = MatchSetStats(FEATURE_CUBE_PATH)
+
+# Funding panels whose model files are present
+funding_cards = [ui.card(ui.output_plot("pie_topic"), ui.output_ui("funding_list"), ui.output_ui("funding_detail"))]
+if match_stats is not None:
+    funding_cards.append(ui.card(ui.h4("Matched projects at a glance"), ui.output_table("match_statistics")))
+
+# Organisation panels whose model files are present
+organisation_cards = []
+if recommender.org_ids is not None:
+    organisation_cards.append(
+        ui.card(ui.h4("Organisations with a similar portfolio"), ui.output_table("similar_organisations"))
+    )
+if collaborator_index is not None:
+    organisation_cards.insert(0, ui.card(ui.h4("Suggested collaborators"), ui.output_table("collaborator_ranking")))
 
 # UI
 app_ui = ui.page_fluid(
@@ -41,13 +110,12 @@ app_ui = ui.page_fluid(
                         </ul>
                         """),
                     ui.input_text_area("proposal", "Enter your research proposal:", rows=6),
-                    ui.input_slider("top_n", "Number of results to display:", min=10, max=20, value=10),
+                    ui.input_slider("top_n", "Number of results per page:", min=10, max=20, value=10),
                     ui.input_action_button("submit", "Find Matching Projects"),
                 ),
-                ui.card(ui.output_table("match_summary"))
-            )
+                ui.card(ui.output_table("match_summary"), ui.input_action_button("load_more", "Load more matches")),
+            ),
         ),
-
         ui.nav_panel(
             "Project Summaries",
             ui.layout_columns(
@@ -55,20 +123,28 @@ app_ui = ui.page_fluid(
                 ui.accordion(
                     ui.accordion_panel("Organisations Overview", output_widget("map"), ui.output_table("org_summary")),
                     ui.accordion_panel("Funding Overview", ui.output_ui("funding_summary")),
-                )
-            )
+                ),
+            ),
         ),
-
-        ui.nav_panel("Organisation Profile", 
+        ui.nav_panel(
+            "Organisation Profile",
+            ui.layout_columns(
+                ui.card(
+                    ui.output_ui("org_profile_acronym_list"),
+                    ui.output_ui("org_profile_org_list"),
+                    ui.output_ui("org_profile_summary"),
+                ),
+                ui.card(output_widget("org_profile_map")),
+            ),
             ui.layout_columns(
-                ui.card(ui.output_ui("org_profile_acronym_list"),ui.output_ui("org_profile_org_list"),ui.output_ui("org_profile_summary")),
-                ui.card(output_widget("org_profile_map"))
-            )
+                *organisation_cards,
+            ),
         ),
-
         ui.nav_panel(
             "Funding Mechanisms",
-            ui.card(ui.output_plot("pie_topic"), ui.output_ui("funding_list"), ui.output_ui("funding_detail")),
+            ui.layout_columns(
+                *funding_cards,
+            ),
         ),
         id="tab",
     )
@@ -77,36 +153,83 @@ app_ui = ui.page_fluid(
 
 # Server
 def server(input, output, session):
-    # Reactive value to hold the match results
-    matches = reactive.Value(pd.DataFrame())
+    # Reactive value to hold the pages of match results, loading more matches appends a page
+    match_pages = reactive.Value([])
+    # Proposal text of the current match set
+    submitted_proposal = reactive.Value("")
+    # Version of the match set, bumped on every submit so memoised views are keyed on it
+    match_version = reactive.Value(0)
+    # Cursor over the ranking of the current proposal, serving further pages without encoding it again
+    match_cursor = reactive.Value(None)
+
+    # Reusable map widgets for the project partners and organisation profile tabs
+    project_map = PartnerMap(center=(50, 10), zoom=4)
+    org_map = PartnerMap(center=(50, 10), zoom=3)
+
+    # Per-session memoisation of derived views (org lookups, plots), and of each map's layers,
+    # which the map closes when evicted unless it still shows them
+    view_cache = SessionCache(SESSION_CACHE_SIZE)
+    project_layer_cache = SessionCache(SESSION_WIDGET_CACHE_SIZE, on_evict=project_map.release)
+    org_layer_cache = SessionCache(SESSION_WIDGET_CACHE_SIZE, on_evict=org_map.release)
 
     # When user clicks the button, update matches
     @reactive.effect
     @reactive.event(input.submit)
+    @timed("app.update_matches")
     def update_matches():
         proposal = input.proposal()
+        match_version.set(match_version.get() + 1)
+        submitted_proposal.set(proposal)
         if not proposal.strip():
-            matches.set(pd.DataFrame())  # empty input
+            match_cursor.set(None)
+            match_pages.set([])  # empty input
+            return
+
+        with PROFILER.profile("app.update_matches", proposal_length=len(proposal), top_n=input.top_n()):
+            cursor = recommender.search_pages(proposal)
+            match_cursor.set(cursor)
+            match_pages.set([lookup_matches(cursor.next_page(input.top_n()))])
+
+    # When user clicks load more, append the next page of the current proposal's matches
+    @reactive.effect
+    @reactive.event(input.load_more)
+    @timed("app.load_more_matches")
+    def load_more_matches():
+        cursor = match_cursor.get()
+        if cursor is None or not cursor.has_more:
             return
 
-        top_match_ids_scores = recommender.get_top_matches(proposal, top_n=input.top_n())
-        ids = [pid for pid, _ in top_match_ids_scores]
+        # A new list, so the reactive value registers the change
+        match_pages.set([*match_pages.get(), lookup_matches(cursor.next_page(input.top_n()))])
+
+    # Match results of all loaded pages, concatenated once per change and shared by every output
+    @reactive.calc
+    def matches():
+        pages = match_pages.get()
+        return pd.concat(pages) if pages else pd.DataFrame()
+
+    # helper function to look up the project rows of a page of (projectID, similarity) matches
+    def lookup_matches(top_match_ids_scores):
+        ranks = {pid: rank for rank, (pid, _) in enumerate(top_match_ids_scores)}
         scores = {pid: score for pid, score in top_match_ids_scores}
 
-        match_df = project_data[project_data["projectID"].isin(ids)].copy()
+        match_df = project_data[project_data["projectID"].isin(ranks)].copy()
         match_df["similarity"] = match_df["projectID"].map(scores)
-        match_df.sort_values("similarity", ascending=False, inplace=True)
-
-        matches.set(match_df)
+        # Keep the recommender's order: with a lexical index it is the fused ranking, not the similarity order
+        return match_df.iloc[match_df["projectID"].map(ranks).argsort().to_numpy()]
 
     # helper function to get project organisations from an acronym (used in map rendering)
     def get_project_orgs(acronym):
-        df = matches.get()
-        orgs = []
+        df = matches()
 
         if not acronym:
             return pd.DataFrame()
 
+        key = (match_version.get(), "orgs", acronym)
+        return view_cache.get_or_compute(key, lambda: lookup_project_orgs(df, acronym))
+
+    def lookup_project_orgs(df, acronym):
+        orgs = []
         row = df[df["acronym"] == acronym].iloc[0]
 
         role_columns = ["coordinator", "participant", "thirdParty", "associatedPartner"]
@@ -132,8 +255,9 @@ def server(input, output, session):
 
     # Output the project match summary (Acronym & Title)
     @render.table
+    @timed("app.match_summary")
     def match_summary():
-        df = matches.get()
+        df = matches()
         if df.empty:
             return pd.DataFrame({"Similar Projects": ["No results yet. Please enter a proposal."]})
 
@@ -141,8 +265,9 @@ def server(input, output, session):
 
     # Output the acronym list
     @render.ui
+    @timed("app.acronym_list")
     def acronym_list():
-        df = matches.get()
+        df = matches()
         if df.empty or "acronym" not in df.columns:
             return ui.p("No results yet.")
 
@@ -151,8 +276,9 @@ def server(input, output, session):
 
     # Output the project detail
     @render.ui
+    @timed("app.project_detail")
     def project_detail():
-        df = matches.get()
+        df = matches()
         selected = input.selected_project()
         if not selected:
             return ui.p("Select a project to view details.")
@@ -161,52 +287,32 @@ def server(input, output, session):
 
         return ui.panel_well(
             ui.h4(row["title"]),
-            ui.p(f"Objective: {row['objective']}"),
+            ui.p(f"Objective: {objective_store.get(row['projectID'])}"),
             ui.a("View full project on CORDIS", href=row["cordis_project_url"], target="_blank"),
         )
 
-    # Output the map
+    # Output the map: one Map instance per session, whose partner layer is swapped in place
     @render_widget
+    @timed("app.map")
     def map():
-        acronym = input.selected_project()
-
-        if not acronym:
-            return Map(center=(50, 10), zoom=4)
-
-        orgs = get_project_orgs(acronym)
-        m = Map(center=(50, 10), zoom=4)
-
-        icon = Icon(
-            icon_url="https://raw.githubusercontent.com/pointhi/leaflet-color-markers/master/img/marker-icon-2x-green.png",
-            icon_size=[25, 41],
-            icon_anchor=[12, 41],
-        )
-
-        for _, row in orgs.iterrows():
-            if pd.isna(row["geolocation"]):
-                continue
-
-            if row["role"] == "coordinator":
-                marker = Marker(
-                    icon=icon,
-                    location=(row["latitude"], row["longitude"]),
-                    title=f"{row['name']} ({row['role']})",
-                    draggable=False,
-                )
+        return project_map.widget
 
-            else:
-                marker = Marker(
-                    location=(row["latitude"], row["longitude"]),
-                    title=f"{row['name']} ({row['role']})",
-                    draggable=False,
-                )
-
-            m.add(marker)
-            marker.popup = HTML(f"<strong>{row['name']}</strong><br>{row['role']}")
+    @reactive.effect
+    @timed("app.update_project_map")
+    def update_project_map():
+        acronym = input.selected_project()
+        key = (match_version.get(), "partners", acronym) if acronym else None
+        if key is None:
+            project_map.show(None)
+            return
 
-        return m
+        # Build outside the effect context so the cached layer is not closed on invalidation
+        with reactive.isolate():
+            layer = project_layer_cache.get_or_compute(key, lambda: build_partner_layer(get_project_orgs(acronym)))
+        project_map.show(layer)
 
     @render.table
+    @timed("app.org_summary")
     def org_summary():
         acronym = input.selected_project()
         if not acronym:
@@ -220,8 +326,9 @@ def server(input, output, session):
 
     # Output the project funding summary
     @render.ui
+    @timed("app.funding_summary")
     def funding_summary():
-        df = matches.get()
+        df = matches()
         selected = input.selected_project()
         if not selected:
             return ui.p("Select a project to view details.")
@@ -236,15 +343,17 @@ def server(input, output, session):
         )
 
     @render.ui
+    @timed("app.org_profile_acronym_list")
     def org_profile_acronym_list():
-        df = matches.get()
+        df = matches()
         if df.empty or "acronym" not in df.columns:
             return ui.p("Submit a proposal first.")
-            
+
         options = df["acronym"].dropna().unique().tolist()
         return ui.input_select("org_selected_acronym", "Select a project acronym:", choices=options)
 
     @render.ui
+    @timed("app.org_profile_org_list")
     def org_profile_org_list():
         acronym = input.org_selected_acronym()
         if not acronym:
@@ -258,13 +367,13 @@ def server(input, output, session):
         return ui.input_select("org_selected_id", "Select an organisation:", choices=options)
 
     @render.ui
+    @timed("app.org_profile_summary")
     def org_profile_summary():
         org_id = input.org_selected_id()
         if not org_id:
             return ui.p("Select an organisation.")
 
-        org_id = int(org_id)
-        row = org_data[org_data["organisationID"] == org_id]
+        row = get_org_row(int(org_id))
         if row.empty:
             return ui.p("Organisation not found.")
 
@@ -273,60 +382,150 @@ def server(input, output, session):
         content = [
             ui.h4(row["name"]),
             ui.p(f"Projects involved: {int(row['n_projects'])}"),
-            ui.p(f"Total funding: €{row['totalCost']:,.0f}")
+            ui.p(f"Total funding: €{row['totalCost']:,.0f}"),
         ]
 
         if pd.notna(row["organizationURL"]) and row["organizationURL"].strip():
-            content.append(
-                ui.a("Organisation Website", href=row["organizationURL"], target="_blank")
-            )
+            content.append(ui.a("Organisation Website", href=row["organizationURL"], target="_blank"))
 
         return ui.panel_well(*content)
 
+    # helper function to look up an organisation's details (organisation data does not depend on matches)
+    def get_org_row(org_id):
+        return view_cache.get_or_compute(("org", org_id), lambda: org_data[org_data["organisationID"] == org_id])
+
     @render_widget
+    @timed("app.org_profile_map")
     def org_profile_map():
-        org_id = input.org_selected_id()
-        if not org_id:
-            return Map(center=(50, 10), zoom=3)
+        return org_map.widget
 
-        org_id = int(org_id)
-        row = org_data[org_data["organisationID"] == org_id]
+    @reactive.effect
+    @timed("app.update_org_profile_map")
+    def update_org_profile_map():
+        org_id = input.org_selected_id()
+        row = get_org_row(int(org_id)) if org_id else pd.DataFrame()
         if row.empty or pd.isna(row.iloc[0]["latitude"]) or pd.isna(row.iloc[0]["longitude"]):
-            return Map(center=(50, 10), zoom=3)
+            org_map.show(None)
+            return
 
         row = row.iloc[0]
         lat, lon = row["latitude"], row["longitude"]
 
-        m = Map(center=(lat, lon), zoom=5)
+        with reactive.isolate():
+            layer = org_layer_cache.get_or_compute(("org_layer", int(org_id)), lambda: build_org_layer(row))
+        org_map.show(layer, center=(lat, lon), zoom=5)
 
-        marker = Marker(
-            location=(lat, lon),
+    def build_org_layer(row):
+        marker = build_marker(
+            location=(row["latitude"], row["longitude"]),
             title=row["name"],
-            draggable=False
+            popup_html=f"<strong>{row['name']}</strong><br>{row['city']}, {row['country']}",
         )
-        marker.popup = HTML(f"<strong>{row['name']}</strong><br>{row['city']}, {row['country']}")
-        m.add(marker)
+        return build_marker_layer([marker])
 
-        return m
+    # Output the organisations ranked as collaborators for the whole match set
+    @render.table
+    @timed("app.collaborator_ranking")
+    def collaborator_ranking():
+        df = matches()
+        if collaborator_index is None:
+            return None
+        if df.empty:
+            return pd.DataFrame({"Suggested collaborators": ["Submit a proposal first."]})
+
+        ranking = collaborator_index.rank_collaborators(df["projectID"].tolist(), top_n=10)
+        ranking = ranking.merge(org_data[["organisationID", "name", "country"]], on="organisationID", how="left")
+        columns = {"name": "Organisation", "country": "Country", "direct": "In matched projects", "degree": "Projects"}
+        return ranking.rename(columns=columns)[["Organisation", "Country", "In matched projects", "Projects"]]
+
+    # Output the organisations whose project portfolio is most similar to the proposal
+    @render.table
+    @timed("app.similar_organisations")
+    def similar_organisations():
+        proposal = submitted_proposal.get()
+        cursor = match_cursor.get()
+        if recommender.org_ids is None:
+            return None
+        if not proposal.strip() or cursor is None:
+            return pd.DataFrame({"Similar organisations": ["Submit a proposal first."]})
+
+        # Reuse the proposal embedding of the match cursor instead of encoding the proposal again
+        key = (match_version.get(), "similar_organisations")
+        org_matches = view_cache.get_or_compute(
+            key, lambda: recommender.get_top_organisations(proposal, top_n=10, query_embedding=cursor.query_embedding)
+        )
+        org_df = pd.DataFrame(org_matches, columns=["organisationID", "similarity"])
+        org_df = org_df.merge(org_data[["organisationID", "name", "country"]], on="organisationID", how="left")
+        return org_df.rename(columns={"name": "Organisation", "country": "Country", "similarity": "Similarity"})[
+            ["Organisation", "Country", "Similarity"]
+        ]
+
+    # Summarise the match set from the precomputed feature cube, loading more matches only appends rows
+    def match_set_summary():
+        df = matches()
+        return view_cache.get_or_compute(
+            (match_version.get(), len(df), "match_set_summary"),
+            lambda: match_stats.summarise(df["projectID"].to_numpy()),
+        )
 
     # Output the pie chart
     @render.plot
+    @timed("app.pie_topic")
     def pie_topic():
-        df = matches.get()
-        if df.empty or "title_topic" not in df.columns:
+        df = matches()
+        if df.empty:
             return
 
-        topic_counts = df["title_topic"].value_counts()
-        plt.figure(figsize=(6, 6))
-        topic_counts.plot.pie(startangle=90, textprops={"fontsize": 10})
-        plt.ylabel("")
-        plt.title("Similar projects funded by")
-        return plt.gcf()
+        if match_stats is not None:
+            labels, counts = match_set_summary()["title_topic"]
+        else:
+            topic_counts = df["title_topic"].value_counts()
+            labels, counts = topic_counts.index.tolist(), topic_counts.to_numpy()
+        return view_cache.get_or_compute(
+            (match_version.get(), len(df), "pie_topic"), lambda: build_topic_pie(labels, counts)
+        )
+
+    def build_topic_pie(labels, counts):
+        # Figure is built outside pyplot so cached figures are not kept alive by its global registry
+        fig = Figure(figsize=(6, 6))
+        ax = fig.subplots()
+        ax.pie(counts, labels=labels, startangle=90, textprops={"fontsize": 10})
+        ax.set_ylabel("")
+        ax.set_title("Similar projects funded by")
+        return fig
+
+    # Output the match-set statistics
+    @render.table
+    @timed("app.match_statistics")
+    def match_statistics():
+        df = matches()
+        if match_stats is None:
+            return None
+        if df.empty:
+            return pd.DataFrame({"Statistic": ["No results yet."]})
+
+        summary = match_set_summary()
+        rows = []
+        for column, label in [
+            ("start_year", "Start years"),
+            ("country", "Partner countries"),
+            ("funding_id", "Funding programmes"),
+        ]:
+            labels, counts = summary[column]
+            rows.append((label, ", ".join(f"{value} ({count})" for value, count in zip(labels[:5], counts[:5]))))
+        for column, label in [
+            ("n_organisations", "Organisations per project"),
+            ("ecMaxContribution", "EU contribution (EUR)"),
+        ]:
+            low, median, high = summary[column]
+            rows.append((label, f"median {median:,.0f} (IQR {low:,.0f} - {high:,.0f})"))
+        return pd.DataFrame(rows, columns=["Statistic", "Value"])
 
     # Output the acronym list
     @render.ui
+    @timed("app.funding_list")
     def funding_list():
-        df = matches.get()
+        df = matches()
         if df.empty or "title_topic" not in df.columns:
             return ui.p("No results yet.")
 
@@ -336,8 +535,9 @@ def server(input, output, session):
 
     # Output the funding detail
     @render.ui
+    @timed("app.funding_detail")
     def funding_detail():
-        df = matches.get()
+        df = matches()
         selected = input.selected_funding()
         if not selected:
             return ui.p("Select a funding scheme to view details.")
@@ -346,11 +546,20 @@ def server(input, output, session):
 
         return ui.panel_well(
             ui.h4(row["title_topic"]),
-            ui.HTML(row["topic_objective"]),
+            ui.HTML(topic_objective_store.get(str(row["funding_id"])) or ""),
             ui.p(""),
             ui.a("View full project on CORDIS", href=row["cordis_funding_url"], target="_blank"),
         )
 
 
+# Prometheus text exposition of the hot-path timings and counters
+async def metrics(request):
+    return PlainTextResponse(METRICS.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+if METRICS_LOG_INTERVAL_S:
+    start_periodic_log_summary(METRICS_LOG_INTERVAL_S)
+
 # App
-app = App(app_ui, server)
+shiny_app = App(app_ui, server)
+app = Starlette(routes=[Route("/metrics", metrics), Mount("/", app=shiny_app)])
@@ -0,0 +1,106 @@
+import argparse
+import datetime
+import os
+
+from loguru import logger
+
+from benchmarks.results import compare_results, save_results
+
+
+def run(args: argparse.Namespace) -> None:
+    """
+    Run the preprocessing and recommender benchmarks at each requested size and save the results
+    """
+    if args.tune_threads:
+        from modern_data_analytics.recommender.backends import configure_threads
+
+        # Once for the whole run, so every encoder benchmark sees the same thread pools
+        configure_threads(args.num_threads)
+
+    from benchmarks.bench_lexical import run_lexical_benchmark
+    from benchmarks.bench_preprocessing import run_preprocessing_benchmark
+
+    results: dict = {"preprocessing": {}, "lexical": {}, "recommender": {}, "encoder_backends": {}, "lazy": {}}
+    for n_projects in args.sizes:
+        logger.info(f"Preprocessing benchmark with {n_projects} projects")
+        results["preprocessing"][str(n_projects)] = run_preprocessing_benchmark(n_projects, seed=args.seed)
+        logger.info(f"Lexical index benchmark with {n_projects} projects")
+        results["lexical"][str(n_projects)] = run_lexical_benchmark(n_projects, seed=args.seed)
+
+    if args.lazy:
+        from benchmarks.bench_lazy import run_lazy_benchmark
+
+        for n_projects in args.sizes:
+            logger.info(f"Lazy preprocessing backend benchmark with {n_projects} projects")
+            results["lazy"][str(n_projects)] = run_lazy_benchmark(n_projects, seed=args.seed)
+
+    if not args.skip_recommender:
+        from benchmarks.bench_recommender import run_recommender_benchmark
+
+        for n_projects in args.sizes:
+            logger.info(f"Recommender benchmark with {n_projects} projects")
+            results["recommender"][str(n_projects)] = run_recommender_benchmark(
+                n_projects, n_queries=args.queries, batch_size=args.batch_size, top_n=args.top_n, seed=args.seed
+            )
+
+    if args.backends:
+        from benchmarks.bench_encoder_backends import run_encoder_backend_benchmark
+
+        logger.info("Encoder backend benchmark")
+        results["encoder_backends"] = run_encoder_backend_benchmark(
+            project_path=args.project_path,
+            n_queries=args.queries,
+            batch_size=args.batch_size,
+            top_n=args.top_n,
+            seed=args.seed,
+        )
+
+    output_path = args.output
+    if output_path is None:
+        os.makedirs("benchmarks/results", exist_ok=True)
+        output_path = f"benchmarks/results/{datetime.datetime.now():%Y%m%d-%H%M%S}.json"
+    save_results(results, output_path)
+
+
+def compare(args: argparse.Namespace) -> None:
+    """
+    Print the relative change of every metric between two result files
+    """
+    for name, values in compare_results(args.baseline, args.candidate).items():
+        print(f"{name:<80} {values['baseline']:>14.4f} {values['candidate']:>14.4f} {values['change']:>+8.1%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmarks of the hot paths")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="run the benchmarks and save the results as JSON")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000], help="numbers of projects")
+    run_parser.add_argument("--queries", type=int, default=50, help="number of timed single queries")
+    run_parser.add_argument("--batch-size", type=int, default=64, help="number of proposals in the throughput batch")
+    run_parser.add_argument("--top-n", type=int, default=10, help="number of matches per query")
+    run_parser.add_argument("--seed", type=int, default=0, help="random seed of the synthetic data")
+    run_parser.add_argument("--skip-recommender", action="store_true", help="skip benchmarks needing the encoder")
+    run_parser.add_argument("--backends", action="store_true", help="validate and time every encoder backend")
+    run_parser.add_argument(
+        "--project-path",
+        default="data/processed/project_merged.csv",
+        help="processed project CSV whose objectives validate the encoder backends",
+    )
+    run_parser.add_argument("--tune-threads", action="store_true", help="tune torch's thread pools before the run")
+    run_parser.add_argument("--num-threads", type=int, help="intra-op threads when tuning, defaults to every CPU")
+    run_parser.add_argument("--lazy", action="store_true", help="check and time the Polars preprocessing backend")
+    run_parser.add_argument("--output", help="path of the results JSON")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = subparsers.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline", help="path of the baseline results JSON")
+    compare_parser.add_argument("candidate", help="path of the candidate results JSON")
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import os
+import time
+
+import pandas as pd
+import torch
+
+from benchmarks.measure import latency_summary
+from modern_data_analytics.constants import OBJECTIVE
+from modern_data_analytics.recommender.backends import ENCODER_BACKENDS, FP32, load_encoder, validate_encoder
+
+
+def load_objectives(project_path: str, n: int, seed: int = 0) -> list[str]:
+    """
+    Sample project objectives from the processed project table, the text the encoder sees in production
+
+    Args:
+        project_path (str): Path of the processed project CSV
+        n (int): Number of objectives
+        seed (int): Random seed of the sample
+
+    Returns:
+        list: n objectives
+    """
+    if not os.path.exists(project_path):
+        raise FileNotFoundError(
+            f"{project_path} not found: the encoder backends are validated on real project objectives, "
+            "run the preprocessing pipeline first"
+        )
+    objectives = pd.read_csv(project_path, usecols=[OBJECTIVE])[OBJECTIVE].dropna()
+    if len(objectives) < n:
+        raise ValueError(f"{project_path} has {len(objectives)} objectives, {n} are needed")
+    return objectives.sample(n, random_state=seed).tolist()
+
+
+def run_encoder_backend_benchmark(
+    project_path: str = "data/processed/project_merged.csv",
+    n_corpus: int = 1_000,
+    n_queries: int = 50,
+    batch_size: int = 64,
+    top_n: int = 10,
+    seed: int = 0,
+) -> dict:
+    """
+    Validate every encoder backend against the stock fp32 model on real project objectives and measure its
+    single-query latency and batch throughput. All backends run on the thread pools configured at startup
+
+    Args:
+        project_path (str): Path of the processed project CSV the corpus and queries are sampled from
+        n_corpus (int): Number of project objectives encoded by the stock model for the recall check
+        n_queries (int): Number of single queries to time and validate, objectives left out of the corpus
+        batch_size (int): Number of proposals in the throughput batch
+        top_n (int): k of the recall@k check
+        seed (int): Random seed
+
+    Returns:
+        dict: validation metrics, query latency summary and batch throughput per backend
+
+    Raises:
+        ValueError: if a backend misses the validation floors of config.py
+    """
+    n_proposals = max(n_queries, batch_size)
+    objectives = load_objectives(project_path, n_corpus + n_proposals, seed=seed)
+    corpus, proposals = objectives[:n_corpus], objectives[n_corpus:]
+
+    reference = load_encoder(FP32)
+    corpus_embeddings = reference.encode(corpus, batch_size=batch_size)
+
+    results = {}
+    for backend in ENCODER_BACKENDS:
+        encoder = reference if backend == FP32 else load_encoder(backend)
+
+        # Warm up the encoder so lazy initialisation is not timed
+        encoder.encode(proposals[:1])
+
+        latencies = []
+        for proposal in proposals[:n_queries]:
+            start = time.perf_counter()
+            encoder.encode([proposal])
+            latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        encoder.encode(proposals[:batch_size], batch_size=batch_size)
+        batch_time = time.perf_counter() - start
+
+        results[backend] = {
+            "validation": validate_encoder(encoder, reference, proposals[:n_queries], corpus_embeddings, k=top_n),
+            "query_latency": latency_summary(latencies),
+            "batch_size": batch_size,
+            "batch_throughput_per_s": batch_size / batch_time,
+            "num_threads": torch.get_num_threads(),
+        }
+
+    return results
@@ -0,0 +1,87 @@
+import os
+import tempfile
+
+import pandas as pd
+
+from benchmarks.measure import measure
+from benchmarks.synthetic import generate_raw_tables
+from modern_data_analytics.constants import AVG_ANNUAL_FUNDING_PER_PARTICIPANT, AVG_FUNDING_PER_PARTICIPANT
+from modern_data_analytics.preprocessing.lazy import preprocess_lazy, scan_raw_tables
+from modern_data_analytics.preprocessing.main import preprocess
+
+# Columns rounded to cents, compared to the cent as Polars and numpy may round halves differently
+ROUNDED_COLUMNS = [AVG_FUNDING_PER_PARTICIPANT, AVG_ANNUAL_FUNDING_PER_PARTICIPANT]
+
+
+def assert_backends_equivalent(expected: pd.DataFrame, actual: pd.DataFrame) -> None:
+    """
+    Check the output of preprocess_lazy() against preprocess(): same columns, dtypes, categories, rows and values.
+    Two differences are intended: Polars divides by a constant through its reciprocal, so floats such as
+    duration_years may differ in the last place and are compared within a relative 1e-12, and the columns rounded
+    to cents may differ by one cent where Polars and numpy round halves differently
+
+    Args:
+        expected (pd.DataFrame): Result of preprocess()
+        actual (pd.DataFrame): Result of preprocess_lazy()
+
+    Raises:
+        AssertionError: if the results differ
+    """
+    expected, actual = expected.reset_index(drop=True), actual.reset_index(drop=True)
+    pd.testing.assert_index_equal(expected.columns, actual.columns)
+    pd.testing.assert_frame_equal(
+        expected.drop(columns=ROUNDED_COLUMNS),
+        actual.drop(columns=ROUNDED_COLUMNS),
+        check_exact=False,
+        rtol=1e-12,
+        atol=0,
+    )
+    pd.testing.assert_frame_equal(
+        expected[ROUNDED_COLUMNS], actual[ROUNDED_COLUMNS], check_exact=False, rtol=0, atol=0.01
+    )
+
+
+def run_lazy_benchmark(n_projects: int, seed: int = 0) -> dict:
+    """
+    Check the Polars lazy backend against preprocess() on synthetic CORDIS tables and time both, from in-memory
+    DataFrames and end to end from CSV files, where the lazy plan only reads the columns it needs
+
+    Args:
+        n_projects (int): Number of synthetic projects
+        seed (int): Random seed of the synthetic data
+
+    Returns:
+        dict: wall times of both backends and the speed-up of the lazy backend
+    """
+    tables = {f"{name}_df": df for name, df in generate_raw_tables(n_projects, seed=seed).items()}
+
+    # preprocess() casts its input tables in place
+    expected, pandas_frames = measure(preprocess, **{name: df.copy() for name, df in tables.items()})
+    actual, lazy_frames = measure(preprocess_lazy, **tables)
+    assert_backends_equivalent(expected, actual)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = {}
+        for name, df in tables.items():
+            paths[name] = os.path.join(tmp_dir, f"{name}.csv")
+            df.to_csv(paths[name], index=False)
+
+        def run_pandas_csv() -> pd.DataFrame:
+            return preprocess(**{name: pd.read_csv(path) for name, path in paths.items()})
+
+        def run_lazy_csv() -> pd.DataFrame:
+            return preprocess_lazy(**scan_raw_tables(**{name[:-3] + "_path": path for name, path in paths.items()}))
+
+        expected, pandas_csv = measure(run_pandas_csv)
+        actual, lazy_csv = measure(run_lazy_csv)
+        assert_backends_equivalent(expected, actual)
+
+    return {
+        "n_projects": n_projects,
+        "pandas_wall_time_s": pandas_frames["wall_time_s"],
+        "lazy_wall_time_s": lazy_frames["wall_time_s"],
+        "speedup": pandas_frames["wall_time_s"] / lazy_frames["wall_time_s"],
+        "pandas_csv_wall_time_s": pandas_csv["wall_time_s"],
+        "lazy_csv_wall_time_s": lazy_csv["wall_time_s"],
+        "csv_speedup": pandas_csv["wall_time_s"] / lazy_csv["wall_time_s"],
+    }
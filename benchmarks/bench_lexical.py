@@ -0,0 +1,49 @@
+import os
+import tempfile
+import time
+
+from benchmarks.measure import latency_summary, measure
+from benchmarks.synthetic import generate_proposals, generate_raw_tables
+from modern_data_analytics.constants import PROJECT_ID
+from modern_data_analytics.preprocessing.main import preprocess
+from modern_data_analytics.preprocessing.utils import build_bm25_index, format_input_text, save_bm25_index
+from modern_data_analytics.recommender.lexical import LexicalIndex
+
+
+def run_lexical_benchmark(n_projects: int, n_queries: int = 200, depth: int = 100, seed: int = 0) -> dict:
+    """
+    Time the BM25 index build over the recommender input text of synthetic projects, and the latency of
+    lexical candidate lookups for synthetic proposals
+
+    Args:
+        n_projects (int): Number of synthetic projects
+        n_queries (int): Number of timed lookups
+        depth (int): Number of candidates per lookup
+        seed (int): Random seed
+
+    Returns:
+        dict: build time, index size on disk and lookup latency summary
+    """
+    tables = generate_raw_tables(n_projects, seed=seed)
+    full_df = preprocess(**{f"{name}_df": df for name, df in tables.items()})
+    index, build = measure(build_bm25_index, full_df[PROJECT_ID], format_input_text(full_df))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        index_path = os.path.join(tmp_dir, "lexical_index.npz")
+        save_bm25_index(index_path, index)
+        index_size_mb = os.path.getsize(index_path) / 1e6
+        lexical_index = LexicalIndex(index_path)
+
+    latencies = []
+    for proposal in generate_proposals(n_queries, seed=seed):
+        start = time.perf_counter()
+        lexical_index.search(proposal, depth)
+        latencies.append(time.perf_counter() - start)
+
+    return {
+        "n_projects": n_projects,
+        "build_wall_time_s": build["wall_time_s"],
+        "n_postings": len(index["gaps"]),
+        "index_size_mb": index_size_mb,
+        "lookup_latency": latency_summary(latencies),
+    }
@@ -0,0 +1,78 @@
+import pandas as pd
+
+from benchmarks.measure import measure
+from benchmarks.synthetic import generate_raw_tables
+from modern_data_analytics.preprocessing.main import (
+    cast_legal_df_dtypes,
+    cast_org_df_dtypes,
+    cast_project_df_dtypes,
+    cast_topics_df_dtypes,
+)
+from modern_data_analytics.preprocessing.utils import (
+    create_full_project_df,
+    legal_summary,
+    merge_full_df_with_programme,
+    project_feature_engineering,
+    project_roles_summary,
+    scivoc_summary,
+)
+
+
+def _run_stages(tables: dict[str, pd.DataFrame], trace_memory: bool) -> dict[str, dict]:
+    """
+    Run every stage of preprocess() in order on copies of the raw tables, measuring each stage
+    """
+    tables = {name: df.copy() for name, df in tables.items()}
+    stages: dict[str, dict] = {}
+
+    def run(name, fn, *args):
+        result, stages[name] = measure(fn, *args, trace_memory=trace_memory)
+        return result
+
+    project_df = run("cast_project_df_dtypes", cast_project_df_dtypes, tables["project"])
+    org_df = run("cast_org_df_dtypes", cast_org_df_dtypes, tables["org"])
+    topics_df = run("cast_topics_df_dtypes", cast_topics_df_dtypes, tables["topics"])
+    legal_df = run("cast_legal_df_dtypes", cast_legal_df_dtypes, tables["legal"])
+
+    scivoc_summary_df = run("scivoc_summary", scivoc_summary, tables["scivoc"])
+    legal_summary_df = run("legal_summary", legal_summary, legal_df)
+    roles_df = run("project_roles_summary", project_roles_summary, org_df)
+
+    full_df = run(
+        "create_full_project_df",
+        create_full_project_df,
+        project_df,
+        roles_df,
+        scivoc_summary_df,
+        topics_df,
+        legal_summary_df,
+    )
+    full_df = run("project_feature_engineering", project_feature_engineering, full_df)
+    run("merge_full_df_with_programme", merge_full_df_with_programme, full_df, tables["programme"])
+
+    return stages
+
+
+def run_preprocessing_benchmark(n_projects: int, seed: int = 0) -> dict:
+    """
+    Time every stage of preprocess() on synthetic CORDIS tables and record its peak memory in a second, traced run
+
+    Args:
+        n_projects (int): Number of synthetic projects
+        seed (int): Random seed of the synthetic data
+
+    Returns:
+        dict: per-stage wall time and peak memory, and the total wall time
+    """
+    tables = generate_raw_tables(n_projects, seed=seed)
+
+    timed = _run_stages(tables, trace_memory=False)
+    traced = _run_stages(tables, trace_memory=True)
+    stages = {name: {**timed[name], **traced[name]} for name in timed}
+
+    return {
+        "n_projects": n_projects,
+        "n_org_rows": len(tables["org"]),
+        "stages": stages,
+        "total_wall_time_s": sum(stage["wall_time_s"] for stage in stages.values()),
+    }
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.measure import latency_summary
+from benchmarks.synthetic import generate_embeddings, generate_proposals
+from modern_data_analytics.recommender import Recommender
+
+
+def build_synthetic_recommender(n_projects: int, seed: int = 0) -> Recommender:
+    """
+    Build a Recommender with the real encoder and synthetic project embeddings
+
+    Args:
+        n_projects (int): Number of synthetic project embeddings
+        seed (int): Random seed
+
+    Returns:
+        Recommender: recommender ready for get_top_matches()
+    """
+    recommender = Recommender()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        embeddings_path = os.path.join(tmp_dir, "project_embeddings.npy")
+        np.save(embeddings_path, generate_embeddings(n_projects, seed=seed))
+        recommender.load_pretrained_project_embeddings(list(range(n_projects)), embeddings_path)
+    return recommender
+
+
+def run_recommender_benchmark(
+    n_projects: int, n_queries: int = 50, batch_size: int = 64, top_n: int = 10, seed: int = 0
+) -> dict:
+    """
+    Measure single-query latency percentiles of Recommender.get_top_matches() and the throughput
+    of Recommender.get_top_matches_batch()
+
+    Args:
+        n_projects (int): Number of synthetic project embeddings
+        n_queries (int): Number of single queries to time
+        batch_size (int): Number of proposals in the throughput batch
+        top_n (int): Number of matches per query
+        seed (int): Random seed
+
+    Returns:
+        dict: query latency summary and batch throughput
+    """
+    recommender = build_synthetic_recommender(n_projects, seed=seed)
+    proposals = generate_proposals(max(n_queries, batch_size), seed=seed)
+
+    # Warm up the encoder so model initialisation is not timed
+    recommender.get_top_matches(proposals[0], top_n=top_n)
+
+    latencies = []
+    for proposal in proposals[:n_queries]:
+        start = time.perf_counter()
+        recommender.get_top_matches(proposal, top_n=top_n)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    recommender.get_top_matches_batch(proposals[:batch_size], top_n=top_n)
+    batch_time = time.perf_counter() - start
+
+    return {
+        "n_projects": n_projects,
+        "top_n": top_n,
+        "query_latency": latency_summary(latencies),
+        "batch_size": batch_size,
+        "batch_throughput_per_s": batch_size / batch_time,
+    }
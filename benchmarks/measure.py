@@ -0,0 +1,60 @@
+import time
+import tracemalloc
+from typing import Any, Callable
+
+import numpy as np
+
+
+def measure(fn: Callable, *args, trace_memory: bool = False, **kwargs) -> tuple[Any, dict]:
+    """
+    Run a function once and measure its wall time, and optionally its peak traced memory.
+    Memory tracing slows down Python-heavy code, so wall times and memory should come from separate runs
+
+    Args:
+        fn (callable): Function to measure
+        *args: Positional arguments of fn
+        trace_memory (bool): Measure peak memory allocated during the call with tracemalloc
+        **kwargs: Keyword arguments of fn
+
+    Returns:
+        tuple: the function result and a dict with wall_time_s, or peak_memory_mb when tracing memory
+    """
+    if not trace_memory:
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        return result, {"wall_time_s": time.perf_counter() - start}
+
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+
+    result = fn(*args, **kwargs)
+
+    _, peak = tracemalloc.get_traced_memory()
+    if not tracing:
+        tracemalloc.stop()
+
+    return result, {"peak_memory_mb": (peak - baseline) / 1e6}
+
+
+def latency_summary(samples_s: list[float]) -> dict:
+    """
+    Summarise latency samples as milliseconds percentiles
+
+    Args:
+        samples_s (list): Latency samples in seconds
+
+    Returns:
+        dict: count, mean and p50/p90/p99/max latency in milliseconds
+    """
+    samples_ms = np.asarray(samples_s) * 1000
+    return {
+        "count": len(samples_ms),
+        "mean_ms": float(samples_ms.mean()),
+        "p50_ms": float(np.percentile(samples_ms, 50)),
+        "p90_ms": float(np.percentile(samples_ms, 90)),
+        "p99_ms": float(np.percentile(samples_ms, 99)),
+        "max_ms": float(samples_ms.max()),
+    }
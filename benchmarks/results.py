@@ -0,0 +1,78 @@
+import datetime
+import json
+import platform
+import subprocess
+
+from loguru import logger
+
+
+def _git_commit() -> str:
+    """
+    Current git commit of the working tree, or "unknown" outside a repository
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def save_results(results: dict, output_path: str) -> None:
+    """
+    Save benchmark results as JSON together with run metadata
+
+    Args:
+        results (dict): Benchmark results keyed by benchmark name
+        output_path (str): Path of the JSON file
+    """
+    payload = {
+        "metadata": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+        },
+        "results": results,
+    }
+    with open(output_path, "w") as f:
+        json.dump(payload, f, indent=2)
+    logger.info(f"Benchmark results saved to: {output_path}")
+
+
+def _flatten(results: dict, prefix: str = "") -> dict[str, float]:
+    """
+    Flatten nested results into dotted metric names, keeping numeric leaves only
+    """
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else str(key)
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
+
+
+def compare_results(baseline_path: str, candidate_path: str) -> dict[str, dict]:
+    """
+    Compare two benchmark result files metric by metric
+
+    Args:
+        baseline_path (str): Path of the baseline results JSON
+        candidate_path (str): Path of the candidate results JSON
+
+    Returns:
+        dict: baseline value, candidate value and relative change for every metric present in both files
+    """
+    with open(baseline_path) as f:
+        baseline = _flatten(json.load(f)["results"])
+    with open(candidate_path) as f:
+        candidate = _flatten(json.load(f)["results"])
+
+    comparison = {}
+    for name in sorted(baseline.keys() & candidate.keys()):
+        change = (candidate[name] - baseline[name]) / baseline[name] if baseline[name] else float("nan")
+        comparison[name] = {"baseline": baseline[name], "candidate": candidate[name], "change": change}
+    return comparison
@@ -0,0 +1,284 @@
+import numpy as np
+import pandas as pd
+
+from modern_data_analytics.constants import (
+    ACTIVE,
+    ACTIVITY_TYPE,
+    ASSOCIATED_PARTNER,
+    CITY,
+    CONTACT_FORM,
+    CONTENT_UPDATE_DATE,
+    COORDINATOR,
+    COUNTRY,
+    EC_CONTRIBUTION,
+    EC_MAX_CONTRIBUTION,
+    EC_SIGNATURE_DATE,
+    END_DATE,
+    END_OF_PARTICIPATION,
+    EURO_SCIVOC_CODE,
+    EURO_SCIVOC_DESCRIPTION,
+    EURO_SCIVOC_PATH,
+    EURO_SCIVOC_TITLE,
+    FRAMEWORK_PROGRAMME,
+    FUNDING_SCHEME,
+    GEOLOCATION,
+    GRANT_DOI,
+    ID,
+    LEGAL_BASIS,
+    MASTER_CALL,
+    NAME,
+    NATURE,
+    NET_EC_CONTRIBUTION,
+    NUTS_CODE,
+    OBJECTIVE,
+    ORDER,
+    ORGANISATION_ID,
+    ORGANIZATION_URL,
+    PARTICIPANT,
+    POST_CODE,
+    PROJECT_ACRONYM,
+    PROJECT_ID,
+    RCN,
+    ROLE,
+    SHORT_NAME,
+    SME,
+    START_DATE,
+    STATUS,
+    STREET,
+    SUB_CALL,
+    THIRD_PARTY,
+    TITLE,
+    TOPIC,
+    TOPICS,
+    TOTAL_COST,
+    UNIQUE_PROGRAMME_PART,
+    VAT_NUMBER,
+)
+
+COUNTRIES = ["BE", "DE", "FR", "IT", "ES", "NL", "SE", "PL", "AT", "PT", "IE", "FI", "DK", "EL", "CZ", "UK", "CH", "NO"]
+ACTIVITY_TYPES = ["HES", "REC", "PRC", "PUB", "OTH"]
+ROLES = [COORDINATOR, PARTICIPANT, THIRD_PARTY, ASSOCIATED_PARTNER]
+ROLE_PROBABILITIES = [0.0, 0.8, 0.1, 0.1]  # coordinators are assigned explicitly, one per project
+FUNDING_SCHEMES = ["HORIZON-ERC", "HORIZON-RIA", "HORIZON-IA", "HORIZON-CSA", "MSCA-DN", "MSCA-PF", "HORIZON-EIC"]
+LEGAL_BASES = ["HORIZON.1.1", "HORIZON.1.2", "HORIZON.2.1", "HORIZON.2.4", "HORIZON.2.5", "HORIZON.3.1"]
+
+
+def _vocabulary(rng: np.random.Generator, size: int) -> np.ndarray:
+    """
+    Random lowercase words to build titles and objectives from
+    """
+    lengths = rng.integers(3, 12, size=size)
+    letters = rng.integers(ord("a"), ord("z") + 1, size=int(lengths.sum())).astype(np.uint8).tobytes().decode()
+    ends = np.cumsum(lengths)
+    return np.array([letters[end - length : end] for length, end in zip(lengths, ends)])
+
+
+def _texts(rng: np.random.Generator, vocabulary: np.ndarray, n: int, mean_words: int) -> list[str]:
+    """
+    Random texts with Zipf-distributed word frequencies, similar to natural language
+    """
+    n_words = np.maximum(rng.poisson(mean_words, size=n), 1)
+    word_ids = (rng.zipf(1.2, size=int(n_words.sum())) - 1) % len(vocabulary)
+    words = vocabulary[word_ids]
+    ends = np.cumsum(n_words)
+    return [" ".join(words[end - count : end]) for count, end in zip(n_words, ends)]
+
+
+def _comma_decimals(values: np.ndarray) -> np.ndarray:
+    """
+    Format numbers with commas as decimal separators, as in the CORDIS CSV exports
+    """
+    return np.char.replace(np.round(values, 2).astype(str), ".", ",")
+
+
+def generate_raw_tables(
+    n_projects: int,
+    mean_orgs_per_project: float = 8.0,
+    n_scivoc_terms: int = 1000,
+    n_topics: int = 500,
+    seed: int = 0,
+) -> dict[str, pd.DataFrame]:
+    """
+    Generate synthetic raw CORDIS tables with the same columns and value formats as the CSV exports
+    read by preprocessing.main.main()
+
+    Args:
+        n_projects (int): Number of projects
+        mean_orgs_per_project (float): Mean number of organisation participations per project
+        n_scivoc_terms (int): Number of distinct EuroSciVoc terms
+        n_topics (int): Number of distinct call topics
+        seed (int): Random seed
+
+    Returns:
+        dict: DataFrames keyed by "project", "org", "scivoc", "topics", "legal" and "programme"
+    """
+    rng = np.random.default_rng(seed)
+    vocabulary = _vocabulary(rng, 20_000)
+
+    # Projects
+    project_ids = 101_000_000 + rng.choice(10 * n_projects, size=n_projects, replace=False)
+    topic_codes = np.array([f"HORIZON-CL{i % 6 + 1}-2023-{i:04d}" for i in range(n_topics)])
+    project_topics = topic_codes[rng.integers(0, n_topics, size=n_projects)]
+    start_dates = pd.Timestamp("2021-01-01") + pd.to_timedelta(rng.integers(0, 1500, size=n_projects), unit="D")
+    end_dates = start_dates + pd.to_timedelta(rng.integers(365, 6 * 365, size=n_projects), unit="D")
+    total_cost = rng.lognormal(14, 1, size=n_projects)
+    legal_bases = np.array(LEGAL_BASES)[rng.integers(0, len(LEGAL_BASES), size=n_projects)]
+
+    project_df = pd.DataFrame(
+        {
+            ID: project_ids,
+            "acronym": _vocabulary(rng, n_projects),
+            STATUS: rng.choice(["SIGNED", "CLOSED", "TERMINATED"], size=n_projects, p=[0.9, 0.08, 0.02]),
+            TITLE: _texts(rng, vocabulary, n_projects, 10),
+            START_DATE: start_dates.strftime("%Y-%m-%d"),
+            END_DATE: end_dates.strftime("%Y-%m-%d"),
+            TOTAL_COST: _comma_decimals(total_cost),
+            EC_MAX_CONTRIBUTION: _comma_decimals(total_cost * rng.uniform(0.5, 1.0, size=n_projects)),
+            LEGAL_BASIS: legal_bases,
+            TOPICS: project_topics,
+            EC_SIGNATURE_DATE: start_dates.strftime("%Y-%m-%d"),
+            FRAMEWORK_PROGRAMME: "HORIZON",
+            MASTER_CALL: np.char.add("HORIZON-CALL-", project_topics),
+            SUB_CALL: project_topics,
+            FUNDING_SCHEME: rng.choice(FUNDING_SCHEMES, size=n_projects),
+            NATURE: "",
+            OBJECTIVE: _texts(rng, vocabulary, n_projects, 250),
+            CONTENT_UPDATE_DATE: "2025-01-01 10:00:00",
+            RCN: rng.integers(200_000, 300_000, size=n_projects),
+            GRANT_DOI: np.char.add("10.3030/", project_ids.astype(str)),
+        }
+    )
+
+    # Organisation participations, the first participation of every project is its coordinator
+    n_orgs = max(int(n_projects * mean_orgs_per_project / 3), 1)
+    orgs_per_project = np.maximum(rng.poisson(mean_orgs_per_project - 1, size=n_projects) + 1, 1)
+    participation_project = np.repeat(np.arange(n_projects), orgs_per_project)
+    n_participations = len(participation_project)
+    order = np.arange(n_participations) - np.repeat(np.cumsum(orgs_per_project) - orgs_per_project, orgs_per_project)
+    roles = np.array(ROLES)[rng.choice(len(ROLES), size=n_participations, p=ROLE_PROBABILITIES)]
+    roles[order == 0] = COORDINATOR
+    org_ids = 900_000_000 + (rng.zipf(1.3, size=n_participations) - 1) % n_orgs
+    org_countries = np.array(COUNTRIES)[org_ids % len(COUNTRIES)]
+    org_costs = rng.lognormal(12, 1, size=n_participations)
+    org_names = np.char.add("Organisation ", org_ids.astype(str))
+
+    org_df = pd.DataFrame(
+        {
+            PROJECT_ID: project_ids[participation_project],
+            PROJECT_ACRONYM: project_df["acronym"].to_numpy()[participation_project],
+            ORGANISATION_ID: org_ids,
+            VAT_NUMBER: np.char.add("VAT", org_ids.astype(str)),
+            NAME: org_names,
+            SHORT_NAME: np.char.add("ORG", org_ids.astype(str)),
+            SME: (org_ids % 5 == 0),
+            ACTIVITY_TYPE: np.array(ACTIVITY_TYPES)[org_ids % len(ACTIVITY_TYPES)],
+            STREET: "Main Street 1",
+            POST_CODE: (org_ids % 9000 + 1000).astype(str),
+            CITY: np.char.add("City ", (org_ids % 500).astype(str)),
+            COUNTRY: org_countries,
+            NUTS_CODE: np.char.add(org_countries, "1"),
+            GEOLOCATION: np.char.add(
+                np.char.add(np.round(36 + (org_ids * 7919 % 2400) / 100, 2).astype(str), ","),
+                np.round(-9 + (org_ids * 104729 % 3400) / 100, 2).astype(str),
+            ),
+            ORGANIZATION_URL: np.char.add("https://www.org", org_ids.astype(str)) + ".eu",
+            CONTACT_FORM: "",
+            CONTENT_UPDATE_DATE: "2025-01-01 10:00:00",
+            RCN: org_ids % 1_000_000,
+            ORDER: order + 1,
+            ROLE: roles,
+            EC_CONTRIBUTION: _comma_decimals(org_costs * 0.8),
+            NET_EC_CONTRIBUTION: _comma_decimals(org_costs * 0.8),
+            TOTAL_COST: _comma_decimals(org_costs),
+            END_OF_PARTICIPATION: False,
+            ACTIVE: True,
+        }
+    )
+
+    # EuroSciVoc classifications, a few Zipf-distributed terms per project
+    scivoc_titles = _vocabulary(rng, n_scivoc_terms)
+    terms_per_project = rng.integers(1, 6, size=n_projects)
+    scivoc_project = np.repeat(np.arange(n_projects), terms_per_project)
+    scivoc_terms = (rng.zipf(1.4, size=len(scivoc_project)) - 1) % n_scivoc_terms
+    scivoc_df = pd.DataFrame(
+        {
+            PROJECT_ID: project_ids[scivoc_project],
+            EURO_SCIVOC_CODE: np.char.add("/", scivoc_terms.astype(str)),
+            EURO_SCIVOC_PATH: np.char.add("/natural sciences/", scivoc_titles[scivoc_terms]),
+            EURO_SCIVOC_TITLE: scivoc_titles[scivoc_terms],
+            EURO_SCIVOC_DESCRIPTION: "",
+        }
+    ).drop_duplicates(subset=[PROJECT_ID, EURO_SCIVOC_CODE])
+
+    # Topics and legal basis
+    topic_titles = np.array(_texts(rng, vocabulary, n_topics, 6))
+    topic_index = pd.Index(topic_codes)
+    topics_df = pd.DataFrame(
+        {
+            PROJECT_ID: project_ids,
+            TOPIC: project_topics,
+            TITLE: topic_titles[topic_index.get_indexer(project_topics)],
+        }
+    )
+    legal_df = pd.DataFrame(
+        {
+            PROJECT_ID: np.concatenate([project_ids, project_ids]),
+            LEGAL_BASIS: np.concatenate([legal_bases, np.char.add(legal_bases, ".1")]),
+            TITLE: np.concatenate([np.char.add("Programme ", legal_bases), np.char.add("Sub-programme ", legal_bases)]),
+            UNIQUE_PROGRAMME_PART: np.concatenate([np.ones(n_projects, bool), np.zeros(n_projects, bool)]),
+        }
+    )
+
+    # Programme descriptions of each call topic
+    programme_df = pd.DataFrame(
+        {
+            ID: np.char.add("HORIZON_", topic_codes),
+            "language": "en",
+            TITLE: topic_titles,
+            FRAMEWORK_PROGRAMME: "HORIZON",
+            OBJECTIVE: ["<p>" + text + "</p>" for text in _texts(rng, vocabulary, n_topics, 150)],
+        }
+    )
+
+    return {
+        "project": project_df,
+        "org": org_df,
+        "scivoc": scivoc_df,
+        "topics": topics_df,
+        "legal": legal_df,
+        "programme": programme_df,
+    }
+
+
+def generate_embeddings(n_projects: int, dim: int = 384, seed: int = 0) -> np.ndarray:
+    """
+    Generate random unit-norm float32 embeddings with the dimension of all-MiniLM-L6-v2
+
+    Args:
+        n_projects (int): Number of embeddings
+        dim (int): Embedding dimension
+        seed (int): Random seed
+
+    Returns:
+        np.ndarray: (n_projects, dim) embedding matrix
+    """
+    rng = np.random.default_rng(seed)
+    embeddings = rng.standard_normal((n_projects, dim), dtype=np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings
+
+
+def generate_proposals(n_proposals: int, mean_words: int = 250, seed: int = 0) -> list[str]:
+    """
+    Generate synthetic proposal texts of roughly project objective length
+
+    Args:
+        n_proposals (int): Number of proposals
+        mean_words (int): Mean number of words per proposal
+        seed (int): Random seed
+
+    Returns:
+        list: proposal strings
+    """
+    rng = np.random.default_rng(seed)
+    return _texts(rng, _vocabulary(rng, 20_000), n_proposals, mean_words)
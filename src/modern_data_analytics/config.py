@@ -1,2 +1,54 @@
+from modern_data_analytics.constants import ASSOCIATED_PARTNER, COORDINATOR, PARTICIPANT, THIRD_PARTY
+
 # model name of the sentence transformer
 EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+# CPU inference backend of the encoder: "fp32" or "int8" (dynamic quantisation)
+ENCODER_BACKEND = "fp32"
+# tune torch's CPU thread pools once at startup of the app and the matching job, with this many intra-op threads
+# (None uses every available CPU)
+TUNE_THREADS = False
+ENCODER_NUM_THREADS = None
+# floors a backend must meet against the stock fp32 encoder: mean embedding drift (1 - cosine similarity) and
+# mean recall@k of the retrieved projects
+ENCODER_MAX_DRIFT = 0.02
+ENCODER_MIN_RECALL = 0.9
+
+# BM25 lexical index: term frequency saturation, length normalisation, and the document frequency ratio above
+# which terms are left out of the index
+BM25_K1 = 1.2
+BM25_B = 0.75
+BM25_MAX_DF_RATIO = 0.5
+# number of rarest proposal terms looked up in the lexical index
+BM25_MAX_QUERY_TERMS = 32
+# reciprocal-rank fusion of dense and lexical results: rank offset k, and number of candidates taken from each
+RRF_K = 60
+RRF_DEPTH = 100
+
+# versioned embedding artifacts watched by the app, and seconds between two checks for a new version (0 disables)
+ARTIFACTS_DIR = "models/versions"
+ARTIFACT_POLL_INTERVAL_S = 30
+
+# per-session memoisation of derived views in the app
+SESSION_CACHE_SIZE = 64
+SESSION_WIDGET_CACHE_SIZE = 16
+
+# partner map layers: plain markers up to the cluster threshold, then a MarkerCluster,
+# then a single GeoJSON layer above the GeoJSON threshold
+MAP_CLUSTER_THRESHOLD = 50
+MAP_GEOJSON_THRESHOLD = 1000
+
+# seconds between two hot-path timing summaries in the app log, 0 disables the summary
+METRICS_LOG_INTERVAL_S = 300
+
+# opt-in request profiler of the serving path: fraction of requests profiled, latency in seconds above which a
+# request is always profiled (None disables), seconds between two stack samples, and the output directory
+PROFILE_SAMPLE_RATE = 0.0
+PROFILE_LATENCY_THRESHOLD_S = None
+PROFILE_INTERVAL_S = 0.005
+PROFILE_DIR = "profiles"
+
+# weight of an organisation's participation in a project by role, used by the co-participation graph
+ROLE_WEIGHTS = {COORDINATOR: 2.0, PARTICIPANT: 1.0, ASSOCIATED_PARTNER: 0.5, THIRD_PARTY: 0.5}
+# weight of the share of an organisation's co-participation that is with the matched projects' partners in the
+# collaborator score
+COLLABORATOR_CO_PARTICIPATION_WEIGHT = 1.0
@@ -72,6 +72,8 @@ N_TITLE_LEGALS = "n_title_legals"
 # Org summary
 N_PROJECTS = "n_projects"
 PROJECTS = "projects"
+LATITUDE = "latitude"
+LONGITUDE = "longitude"
 
 # Project roles summary
 COORDINATOR = "coordinator"
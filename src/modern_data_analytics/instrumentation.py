@@ -0,0 +1,205 @@
+import re
+import threading
+import time
+from collections import deque
+from contextlib import ContextDecorator, contextmanager
+from typing import Iterator, Optional
+
+import numpy as np
+from loguru import logger
+
+# number of most recent timings kept per stage to estimate quantiles
+TIMING_RESERVOIR_SIZE = 1024
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class MetricsRegistry:
+    def __init__(self, namespace: str = "mda"):
+        """
+        Initialise an in-process registry of counters and stage timings
+
+        Args:
+            namespace (str): Prefix of the metric names in the Prometheus text exposition
+        """
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = {}
+        self._timings: dict[str, dict] = {}
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """
+        Increment a counter
+
+        Args:
+            name (str): Counter name, e.g. "recommender.queries"
+            value (float): Amount to add
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, seconds: float) -> None:
+        """
+        Record the duration of one execution of a stage
+
+        Args:
+            name (str): Stage name, e.g. "recommender.encode"
+            seconds (float): Duration in seconds
+        """
+        with self._lock:
+            timing = self._timings.get(name)
+            if timing is None:
+                timing = {"count": 0, "sum": 0.0, "max": 0.0, "recent": deque(maxlen=TIMING_RESERVOIR_SIZE)}
+                self._timings[name] = timing
+            timing["count"] += 1
+            timing["sum"] += seconds
+            timing["max"] = max(timing["max"], seconds)
+            timing["recent"].append(seconds)
+
+    def snapshot(self) -> dict:
+        """
+        Return a consistent copy of every counter and timing summary
+
+        Returns:
+            dict: "counters" by name, and "timings" by name with count, sum, max and quantiles in seconds
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            timings = {name: {**timing, "recent": np.array(timing["recent"])} for name, timing in self._timings.items()}
+
+        summaries = {}
+        for name, timing in timings.items():
+            summaries[name] = {
+                "count": timing["count"],
+                "sum": timing["sum"],
+                "max": timing["max"],
+                "quantiles": {q: float(np.quantile(timing["recent"], q)) for q in QUANTILES},
+            }
+        return {"counters": counters, "timings": summaries}
+
+    def reset(self) -> None:
+        """
+        Drop every counter and timing
+        """
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+
+    def render_prometheus(self) -> str:
+        """
+        Render the metrics in the Prometheus text exposition format: counters as one counter family
+        labelled by name and stage timings as one summary family labelled by stage
+
+        Returns:
+            str: Prometheus text exposition
+        """
+        snapshot = self.snapshot()
+        counter_metric = f"{self.namespace}_events_total"
+        timing_metric = f"{self.namespace}_stage_duration_seconds"
+
+        lines = [f"# TYPE {counter_metric} counter"]
+        for name, value in sorted(snapshot["counters"].items()):
+            lines.append(f'{counter_metric}{{name="{_label(name)}"}} {value}')
+
+        lines.append(f"# TYPE {timing_metric} summary")
+        for name, timing in sorted(snapshot["timings"].items()):
+            stage = _label(name)
+            for q, value in timing["quantiles"].items():
+                lines.append(f'{timing_metric}{{stage="{stage}",quantile="{q}"}} {value:.6f}')
+            lines.append(f'{timing_metric}_sum{{stage="{stage}"}} {timing["sum"]:.6f}')
+            lines.append(f'{timing_metric}_count{{stage="{stage}"}} {timing["count"]}')
+
+        return "\n".join(lines) + "\n"
+
+    def log_summary(self) -> None:
+        """
+        Log one line per stage with its call count, mean, p50, p99 and max duration
+        """
+        for name, timing in sorted(self.snapshot()["timings"].items()):
+            mean_ms = 1000 * timing["sum"] / timing["count"]
+            logger.info(
+                f"{name}: n={timing['count']} mean={mean_ms:.1f}ms p50={1000 * timing['quantiles'][0.5]:.1f}ms "
+                f"p99={1000 * timing['quantiles'][0.99]:.1f}ms max={1000 * timing['max']:.1f}ms"
+            )
+
+
+def _label(name: str) -> str:
+    """
+    Escape a metric name for use as a Prometheus label value
+    """
+    return re.sub(r'["\\\n]', "_", name)
+
+
+# Default registry shared by the package and the app
+METRICS = MetricsRegistry()
+
+# Stage timings collected on each thread by record_stages()
+_stage_traces = threading.local()
+
+
+@contextmanager
+def record_stages() -> Iterator[list[tuple[str, float]]]:
+    """
+    Collect the stages timed on this thread within the block, e.g. the stages of one profiled request.
+    A nested block collects into its own list until it exits
+
+    Yields:
+        list: (stage name, seconds) of every stage exited within the block, in order
+    """
+    previous = getattr(_stage_traces, "stages", None)
+    stages: list[tuple[str, float]] = []
+    _stage_traces.stages = stages
+    try:
+        yield stages
+    finally:
+        _stage_traces.stages = previous
+
+
+class timed(ContextDecorator):
+    def __init__(self, name: str, registry: Optional[MetricsRegistry] = None):
+        """
+        Time a block or a function and record its duration as a stage timing. Usable as a context
+        manager (`with timed("stage"): ...`) or a decorator (`@timed("stage")`)
+
+        Args:
+            name (str): Stage name
+            registry (MetricsRegistry): Registry to record into, defaults to METRICS
+        """
+        self.name = name
+        self.registry = registry if registry is not None else METRICS
+        self._starts: threading.local = threading.local()
+
+    def __enter__(self) -> "timed":
+        if not hasattr(self._starts, "stack"):
+            self._starts.stack = []
+        self._starts.stack.append(time.perf_counter())
+        return self
+
+    def __exit__(self, *exc) -> None:
+        seconds = time.perf_counter() - self._starts.stack.pop()
+        self.registry.observe(self.name, seconds)
+        stages = getattr(_stage_traces, "stages", None)
+        if stages is not None:
+            stages.append((self.name, seconds))
+
+
+def start_periodic_log_summary(interval_s: float, registry: Optional[MetricsRegistry] = None) -> threading.Thread:
+    """
+    Log a summary of the stage timings every interval from a daemon thread
+
+    Args:
+        interval_s (float): Seconds between two summaries
+        registry (MetricsRegistry): Registry to summarise, defaults to METRICS
+
+    Returns:
+        threading.Thread: the started daemon thread
+    """
+    registry = registry if registry is not None else METRICS
+
+    def run():
+        while True:
+            time.sleep(interval_s)
+            registry.log_summary()
+
+    thread = threading.Thread(target=run, name="metrics-log-summary", daemon=True)
+    thread.start()
+    return thread
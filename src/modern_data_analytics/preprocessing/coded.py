@@ -0,0 +1,210 @@
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+
+class CodedLists:
+    def __init__(self, keys: np.ndarray, offsets: np.ndarray, codes: np.ndarray, vocabulary: np.ndarray):
+        """
+        Ragged per-key lists of categorical values stored as CSR arrays: the values of keys[i] are
+        vocabulary[codes[offsets[i]:offsets[i + 1]]]. Replaces columns of Python lists of strings such as
+        the sciVocTopics of scivoc_summary() and the titleLegal of legal_summary()
+
+        Args:
+            keys (np.ndarray): Key of every list, e.g. project ids
+            offsets (np.ndarray): len(keys) + 1 start offsets of the lists in codes
+            codes (np.ndarray): Vocabulary codes of the values of all lists, one list after the other
+            vocabulary (np.ndarray): Sorted distinct values
+        """
+        self.keys = keys
+        self.offsets = offsets
+        self.codes = codes
+        self.vocabulary = vocabulary
+
+    @classmethod
+    def from_long(
+        cls, df: pd.DataFrame, key_column: str, value_column: str, unique: bool = False, sort: bool = False
+    ) -> "CodedLists":
+        """
+        Build the lists from a long DataFrame with one (key, value) row per list element, without grouping
+        in Python. Keys are sorted, and values keep their row order unless sorted
+
+        Args:
+            df (pd.DataFrame): Long DataFrame, e.g. the raw sciVoc table
+            key_column (str): Column of the keys
+            value_column (str): Column of the values, missing values are dropped
+            unique (bool): Keep each value once per key
+            sort (bool): Sort the values of each list
+
+        Returns:
+            CodedLists: lists of every key with at least one value
+        """
+        df = df[[key_column, value_column]].dropna()
+        key_codes, keys = pd.factorize(df[key_column], sort=True)
+        value_codes, vocabulary = pd.factorize(df[value_column], sort=True)
+
+        if sort:
+            order = np.lexsort((value_codes, key_codes))
+        else:
+            order = np.argsort(key_codes, kind="stable")
+        key_codes, value_codes = key_codes[order], value_codes[order]
+
+        if unique:
+            # Keep the first occurrence of every (key, value) pair
+            pairs = key_codes.astype(np.int64) * max(len(vocabulary), 1) + value_codes
+            _, first = np.unique(pairs, return_index=True)
+            first.sort()
+            key_codes, value_codes = key_codes[first], value_codes[first]
+
+        offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(key_codes, minlength=len(keys)), out=offsets[1:])
+        return cls(np.asarray(keys), offsets, value_codes.astype(np.int32), np.asarray(vocabulary, dtype=str))
+
+    @classmethod
+    def from_lists(cls, keys: pd.Series, lists: pd.Series, **kwargs) -> "CodedLists":
+        """
+        Build the lists from a column of Python lists, e.g. the sciVocTopics column of a processed CSV
+
+        Args:
+            keys (pd.Series): Key of every list
+            lists (pd.Series): Lists of values, non-list entries are empty lists
+            **kwargs: unique and sort options of from_long()
+
+        Returns:
+            CodedLists: lists of every key, in sorted key order
+        """
+        lists = lists.where(lists.map(lambda x: isinstance(x, list)), None)
+        long_df = pd.DataFrame({"key": keys.to_numpy(), "value": lists.to_numpy()}).explode("value")
+        coded = cls.from_long(long_df, "key", "value", **kwargs)
+        return coded.reindex(np.sort(keys.unique()))
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def lengths(self) -> np.ndarray:
+        """
+        Number of values of every list
+        """
+        return np.diff(self.offsets)
+
+    def row_ids(self) -> np.ndarray:
+        """
+        Position of the list of every entry of codes
+        """
+        return np.repeat(np.arange(len(self.keys)), self.lengths())
+
+    def _gather(self, positions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Offsets and codes of the lists at the given positions, -1 gives an empty list
+        """
+        valid = positions >= 0
+        safe_positions = np.where(valid, positions, 0)
+        starts = self.offsets[safe_positions]
+        ends = self.offsets[np.minimum(safe_positions + 1, len(self.offsets) - 1)]
+        lengths = np.where(valid, ends - starts, 0)
+
+        offsets = np.zeros(len(positions) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        index = np.arange(offsets[-1]) - np.repeat(offsets[:-1] - starts, lengths)
+        return offsets, self.codes[index]
+
+    def take(self, positions: np.ndarray) -> "CodedLists":
+        """
+        Gather the lists at the given positions, e.g. the projects of a match set
+
+        Args:
+            positions (np.ndarray): List positions
+
+        Returns:
+            CodedLists: lists in the order of positions, sharing the vocabulary
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        offsets, codes = self._gather(positions)
+        return CodedLists(self.keys[positions], offsets, codes, self.vocabulary)
+
+    def reindex(self, keys: Iterable) -> "CodedLists":
+        """
+        Align the lists to the given keys, keys without a list get an empty one
+
+        Args:
+            keys: Keys in the wanted order, e.g. the projectID column of the full project DataFrame
+
+        Returns:
+            CodedLists: one list per given key
+        """
+        keys = np.asarray(keys)
+        offsets, codes = self._gather(pd.Index(self.keys).get_indexer(keys).astype(np.int64))
+        return CodedLists(keys, offsets, codes, self.vocabulary)
+
+    def encode(self, values: Iterable[str]) -> np.ndarray:
+        """
+        Vocabulary codes of the given values, -1 for values not in the vocabulary
+        """
+        values = np.asarray(list(values), dtype=str)
+        if len(self.vocabulary) == 0:
+            return np.full(len(values), -1)
+        found = np.minimum(np.searchsorted(self.vocabulary, values), len(self.vocabulary) - 1)
+        return np.where(self.vocabulary[found] == values, found, -1)
+
+    def contains_any(self, values: Iterable[str]) -> np.ndarray:
+        """
+        Boolean mask of the lists containing at least one of the values, for filtering
+
+        Args:
+            values: Values to look for, e.g. sciVoc topics
+
+        Returns:
+            np.ndarray: one boolean per list
+        """
+        codes = self.encode(values)
+        mask = np.zeros(len(self.keys), dtype=bool)
+        mask[self.row_ids()[np.isin(self.codes, codes[codes >= 0])]] = True
+        return mask
+
+    def join(self, sep: str = " ") -> np.ndarray:
+        """
+        Join the values of every list into one string, e.g. for format_input_text()
+
+        Args:
+            sep (str): Separator between values
+
+        Returns:
+            np.ndarray: object array of one string per list, empty lists give ""
+        """
+        joined = np.full(len(self.keys), "", dtype=object)
+        first = self.offsets[np.flatnonzero(self.lengths())]
+        if len(first):
+            # Every value is preceded by the separator except the first value of each list
+            labels = np.char.add(sep, self.vocabulary).astype(object)[self.codes]
+            labels[first] = self.vocabulary.astype(object)[self.codes[first]]
+            joined[np.flatnonzero(self.lengths())] = np.add.reduceat(labels, first)
+        return joined
+
+    def to_lists(self) -> list[list[str]]:
+        """
+        Convert back to Python lists of values
+        """
+        if len(self.keys) == 0:
+            return []
+        return [values.tolist() for values in np.split(self.vocabulary[self.codes], self.offsets[1:-1])]
+
+    def to_frame(self, key_column: str, value_column: str) -> pd.DataFrame:
+        """
+        Convert back to a DataFrame with a key column and a column of Python lists
+        """
+        return pd.DataFrame({key_column: self.keys, value_column: self.to_lists()})
+
+    def save(self, path: str) -> None:
+        """
+        Save the CSR arrays as a numpy archive (.npz)
+        """
+        np.savez(path, keys=self.keys, offsets=self.offsets, codes=self.codes, vocabulary=self.vocabulary)
+
+    @classmethod
+    def load(cls, path: str) -> "CodedLists":
+        """
+        Load an archive written by save()
+        """
+        with np.load(path) as archive:
+            return cls(archive["keys"], archive["offsets"], archive["codes"], archive["vocabulary"])
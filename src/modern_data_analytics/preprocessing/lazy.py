@@ -0,0 +1,246 @@
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from modern_data_analytics.constants import (
+    ASSOCIATED_PARTNER,
+    AVG_ANNUAL_FUNDING_PER_PARTICIPANT,
+    AVG_FUNDING_PER_PARTICIPANT,
+    CONTENT_UPDATE_DATE,
+    COORDINATOR,
+    CORDIS_FUNDING_URL,
+    CORDIS_PROJECT_URL,
+    DURATION_YEARS,
+    EC_MAX_CONTRIBUTION,
+    EC_SIGNATURE_DATE,
+    END_DATE,
+    EURO_SCIVOC_TITLE,
+    FRAMEWORK_PROGRAMME,
+    FUNDING_ID,
+    FUNDING_SCHEME,
+    GRANT_DOI,
+    ID,
+    LEGAL_BASIS,
+    MASTER_CALL,
+    N_ORGANISATIONS,
+    N_TITLE_LEGALS,
+    NATURE,
+    OBJECTIVE,
+    ORGANISATION_ID,
+    PARTICIPANT,
+    PROJECT_ID,
+    RCN,
+    ROLE,
+    SCIVOC_TOPICS,
+    START_DATE,
+    STATUS,
+    SUB_CALL,
+    THIRD_PARTY,
+    TITLE,
+    TITLE_LEGAL,
+    TITLE_TOPIC,
+    TOPIC_OBJECTIVE,
+    TOPICS,
+    TOTAL_COST,
+)
+
+try:
+    import polars as pl
+except ImportError:  # optional dependency, see the "lazy" extra
+    pl = None  # type: ignore[assignment]
+
+ROLES = [COORDINATOR, PARTICIPANT, THIRD_PARTY, ASSOCIATED_PARTNER]
+CATEGORY_COLUMNS = [STATUS, LEGAL_BASIS, TOPICS, FRAMEWORK_PROGRAMME, FUNDING_SCHEME, MASTER_CALL, SUB_CALL]
+STRING_COLUMNS = [TITLE, OBJECTIVE, TITLE_TOPIC]
+LIST_COLUMNS = [*ROLES, SCIVOC_TOPICS, TITLE_LEGAL]
+DROPPED_PROJECT_COLUMNS = [EC_SIGNATURE_DATE, NATURE, CONTENT_UPDATE_DATE, RCN, GRANT_DOI]
+PROJECT_URL = "https://cordis.europa.eu/project/id/"
+FUNDING_URL = "https://cordis.europa.eu/programme/id/HORIZON_"
+
+
+def _require_polars() -> None:
+    if pl is None:
+        raise ImportError("The lazy preprocessing backend needs polars, install it with: pip install '.[lazy]'")
+
+
+def _lazy(table: Union[pd.DataFrame, "pl.LazyFrame"]) -> "pl.LazyFrame":
+    """
+    Wrap a pandas DataFrame as a LazyFrame, LazyFrames (e.g. from scan_raw_tables()) are returned as is
+    """
+    if isinstance(table, pl.LazyFrame):
+        return table
+    return pl.from_pandas(table).lazy()
+
+
+def _to_datetime(name: str, schema: "pl.Schema") -> "pl.Expr":
+    """
+    Parse a date column like pd.to_datetime(errors="coerce")
+    """
+    if schema[name] == pl.String:
+        return pl.col(name).str.to_datetime(time_unit="ns", strict=False)
+    return pl.col(name).cast(pl.Datetime("ns"), strict=False)
+
+
+def _comma_decimal(name: str) -> "pl.Expr":
+    """
+    Parse numbers with commas as decimal separators like cast_numeric_with_comma_decimal()
+    """
+    return pl.col(name).cast(pl.String).str.replace(",", ".", literal=True).cast(pl.Float64, strict=False)
+
+
+def _null_if_zero(expr: "pl.Expr") -> "pl.Expr":
+    return pl.when(expr == 0).then(None).otherwise(expr)
+
+
+def scan_raw_tables(
+    project_path: str, org_path: str, scivoc_path: str, topics_path: str, legal_path: str, programme_path: str
+) -> dict[str, "pl.LazyFrame"]:
+    """
+    Scan the raw CSV exports lazily, so only the columns and rows the plan needs are read
+
+    Args:
+        project_path (str): Path to project CSV
+        org_path (str): Path to organisations CSV
+        scivoc_path (str): Path to sciVocTopics CSV
+        topics_path (str): Path to topics CSV
+        legal_path (str): Path to legal basis CSV
+        programme_path (str): Path to framework programme CSV
+
+    Returns:
+        dict: LazyFrames keyed by the argument names of preprocess_lazy()
+    """
+    _require_polars()
+    paths = {
+        "project_df": project_path,
+        "org_df": org_path,
+        "scivoc_df": scivoc_path,
+        "topics_df": topics_path,
+        "legal_df": legal_path,
+        "programme_df": programme_path,
+    }
+    return {name: pl.scan_csv(path, infer_schema_length=10_000) for name, path in paths.items()}
+
+
+def preprocess_plan(
+    project_df: "pl.LazyFrame",
+    org_df: "pl.LazyFrame",
+    scivoc_df: "pl.LazyFrame",
+    topics_df: "pl.LazyFrame",
+    legal_df: "pl.LazyFrame",
+    programme_df: "pl.LazyFrame",
+) -> "pl.LazyFrame":
+    """
+    Express the casts, summaries, joins and feature engineering of preprocess() as a single lazy query plan.
+    Columns dropped by create_full_project_df() are never parsed, and the summaries only read the columns
+    they aggregate
+
+    Args:
+        project_df (pl.LazyFrame): Project table
+        org_df (pl.LazyFrame): Organisation table
+        scivoc_df (pl.LazyFrame): SciVoc table
+        topics_df (pl.LazyFrame): Topics table
+        legal_df (pl.LazyFrame): Legal basis table
+        programme_df (pl.LazyFrame): Programme table
+
+    Returns:
+        pl.LazyFrame: plan of the merged project table, with categorical columns still as strings
+    """
+    schema = project_df.collect_schema()
+    project = project_df.drop(DROPPED_PROJECT_COLUMNS, strict=False).rename({ID: PROJECT_ID})
+    project = project.with_columns(
+        _to_datetime(START_DATE, schema),
+        _to_datetime(END_DATE, schema),
+        pl.col(TITLE, OBJECTIVE).cast(pl.String),
+        pl.col(CATEGORY_COLUMNS).cast(pl.String),
+        _comma_decimal(TOTAL_COST),
+        _comma_decimal(EC_MAX_CONTRIBUTION),
+    )
+
+    # Organisation ids per role in participation order, as in project_roles_summary()
+    roles = (
+        org_df.select(PROJECT_ID, ORGANISATION_ID, pl.col(ROLE).cast(pl.String).str.strip_chars())
+        .filter(pl.col(ROLE).is_in(ROLES))
+        .group_by(PROJECT_ID)
+        .agg(
+            *[pl.col(ORGANISATION_ID).filter(pl.col(ROLE) == role).alias(role) for role in ROLES],
+            pl.len().cast(pl.Int64).alias(N_ORGANISATIONS),
+        )
+    )
+    scivoc = (
+        scivoc_df.select(PROJECT_ID, EURO_SCIVOC_TITLE)
+        .drop_nulls()
+        .group_by(PROJECT_ID)
+        .agg(pl.col(EURO_SCIVOC_TITLE).alias(SCIVOC_TOPICS))
+    )
+    topics = topics_df.select(PROJECT_ID, pl.col(TITLE).cast(pl.String).alias(TITLE_TOPIC))
+    legal = (
+        legal_df.select(PROJECT_ID, pl.col(TITLE).cast(pl.String).alias(TITLE_LEGAL))
+        .drop_nulls()
+        .group_by(PROJECT_ID)
+        .agg(pl.col(TITLE_LEGAL).unique().sort())
+        .with_columns(pl.col(TITLE_LEGAL).list.len().cast(pl.Int64).alias(N_TITLE_LEGALS))
+    )
+
+    merged = project
+    for summary in [roles, scivoc, topics, legal]:
+        merged = merged.join(summary, on=PROJECT_ID, how="left", maintain_order="left_right")
+
+    # Feature engineering of project_feature_engineering()
+    valid_orgs = _null_if_zero(pl.col(N_ORGANISATIONS))
+    duration_years = (pl.col(END_DATE) - pl.col(START_DATE)).dt.total_days() / 365.25
+    topics_text = pl.col(TOPICS).fill_null("nan")
+    merged = merged.with_columns(
+        (pl.col(TOTAL_COST) / valid_orgs).round(2).alias(AVG_FUNDING_PER_PARTICIPANT),
+        duration_years.alias(DURATION_YEARS),
+        (pl.col(TOTAL_COST) / (valid_orgs * _null_if_zero(duration_years)))
+        .round(2)
+        .alias(AVG_ANNUAL_FUNDING_PER_PARTICIPANT),
+        (pl.lit(PROJECT_URL) + pl.col(PROJECT_ID).cast(pl.String)).alias(CORDIS_PROJECT_URL),
+        (pl.lit(FUNDING_URL) + topics_text).alias(CORDIS_FUNDING_URL),
+        (pl.lit("HORIZON_") + topics_text).alias(FUNDING_ID),
+    )
+
+    programme = programme_df.select(
+        pl.col(ID).cast(pl.String).alias(FUNDING_ID), pl.col(OBJECTIVE).alias(TOPIC_OBJECTIVE)
+    )
+    return merged.join(programme, on=FUNDING_ID, how="left", maintain_order="left_right")
+
+
+def preprocess_lazy(
+    project_df: Union[pd.DataFrame, "pl.LazyFrame"],
+    org_df: Union[pd.DataFrame, "pl.LazyFrame"],
+    scivoc_df: Union[pd.DataFrame, "pl.LazyFrame"],
+    topics_df: Union[pd.DataFrame, "pl.LazyFrame"],
+    legal_df: Union[pd.DataFrame, "pl.LazyFrame"],
+    programme_df: Union[pd.DataFrame, "pl.LazyFrame"],
+) -> pd.DataFrame:
+    """
+    Run preprocess() as one optimised, multi-threaded Polars plan and return the same pandas DataFrame
+
+    Args:
+        project_df: Project table, as a pandas DataFrame or a LazyFrame from scan_raw_tables()
+        org_df: Organisation table
+        scivoc_df: SciVoc table
+        topics_df: Topics table
+        legal_df: Legal basis table
+        programme_df: Programme table
+
+    Returns:
+        pd.DataFrame: Merged DataFrame with all the processed data, with the dtypes of the pandas path
+    """
+    _require_polars()
+    plan = preprocess_plan(
+        _lazy(project_df), _lazy(org_df), _lazy(scivoc_df), _lazy(topics_df), _lazy(legal_df), _lazy(programme_df)
+    )
+    full_df = plan.collect().to_pandas()
+
+    # Match the pandas path: NaN rather than None for missing text, Python lists with NaN for projects without a
+    # summary, string and category dtypes
+    text_columns = full_df.select_dtypes(include="object").columns.difference(LIST_COLUMNS, sort=False)
+    full_df[text_columns] = full_df[text_columns].where(full_df[text_columns].notna(), np.nan)
+    for column in LIST_COLUMNS:
+        full_df[column] = [values.tolist() if isinstance(values, np.ndarray) else np.nan for values in full_df[column]]
+    full_df[STRING_COLUMNS] = full_df[STRING_COLUMNS].astype("string")
+    full_df[CATEGORY_COLUMNS] = full_df[CATEGORY_COLUMNS].astype("category")
+    return full_df
@@ -1,3 +1,6 @@
+import os
+from typing import Optional
+
 import pandas as pd
 from loguru import logger
 
@@ -14,6 +17,7 @@ from modern_data_analytics.constants import (
     LEGAL_BASIS,
     MASTER_CALL,
     OBJECTIVE,
+    PROJECT_ID,
     ROLE,
     SME,
     START_DATE,
@@ -25,14 +29,26 @@ from modern_data_analytics.constants import (
     TOPICS,
     TOTAL_COST,
 )
+from modern_data_analytics.instrumentation import METRICS, timed
+from modern_data_analytics.preprocessing.lazy import preprocess_lazy, scan_raw_tables
 from modern_data_analytics.preprocessing.utils import (
+    build_bm25_index,
     cast_dtype,
     cast_numeric_with_comma_decimal,
+    coparticipation_adjacency,
     create_full_project_df,
+    format_input_text,
+    legal_codes,
     legal_summary,
     merge_full_df_with_programme,
+    org_project_incidence,
+    project_feature_cube,
     project_feature_engineering,
     project_roles_summary,
+    save_bm25_index,
+    save_coparticipation_graph,
+    save_project_feature_cube,
+    scivoc_codes,
     scivoc_summary,
 )
 
@@ -137,26 +153,33 @@ def preprocess(
         pd.DataFrame: Merged DataFrame with all the processed data
     """
     # Cast datatype
-    project_df = cast_project_df_dtypes(project_df)
-    org_df = cast_org_df_dtypes(org_df)
-    topics_df = cast_topics_df_dtypes(topics_df)
-    legal_df = cast_legal_df_dtypes(legal_df)
+    with timed("preprocess.cast_dtypes"):
+        project_df = cast_project_df_dtypes(project_df)
+        org_df = cast_org_df_dtypes(org_df)
+        topics_df = cast_topics_df_dtypes(topics_df)
+        legal_df = cast_legal_df_dtypes(legal_df)
 
     # Create summary dataframe
-    scivoc_summary_df = scivoc_summary(scivoc_df)
-    legal_summary_df = legal_summary(legal_df)
-    project_roles_summary_df = project_roles_summary(org_df)
+    with timed("preprocess.scivoc_summary"):
+        scivoc_summary_df = scivoc_summary(scivoc_df)
+    with timed("preprocess.legal_summary"):
+        legal_summary_df = legal_summary(legal_df)
+    with timed("preprocess.project_roles_summary"):
+        project_roles_summary_df = project_roles_summary(org_df)
 
     # Merge dataframes
-    full_df = create_full_project_df(
-        project_df, project_roles_summary_df, scivoc_summary_df, topics_df, legal_summary_df
-    )
+    with timed("preprocess.create_full_project_df"):
+        full_df = create_full_project_df(
+            project_df, project_roles_summary_df, scivoc_summary_df, topics_df, legal_summary_df
+        )
 
     # Feature engineering on full_df
-    full_df = project_feature_engineering(full_df)
+    with timed("preprocess.project_feature_engineering"):
+        full_df = project_feature_engineering(full_df)
 
     # Merge full_df with programme dataframe
-    full_merge_df = merge_full_df_with_programme(full_df, programme_df)
+    with timed("preprocess.merge_full_df_with_programme"):
+        full_merge_df = merge_full_df_with_programme(full_df, programme_df)
     return full_merge_df
 
 
@@ -168,6 +191,11 @@ def main(
     legal_path: str,
     programme_path: str,
     output_path: str,
+    graph_path: Optional[str] = None,
+    cube_path: Optional[str] = None,
+    lexical_index_path: Optional[str] = None,
+    coded_lists_dir: Optional[str] = None,
+    backend: str = "pandas",
 ) -> None:
     """
     Main function to read input CSVs, process them, and save the output.
@@ -180,16 +208,61 @@ def main(
         legal_path (str): Path to legal basis CSV
         programme_path (str): Path to framework programme CSV
         output_path (str): Path to save the processed CSV
+        graph_path (str): Optional path to save the organisation co-participation graph (.npz)
+        cube_path (str): Optional path to save the project feature cube for match-set statistics (.npz)
+        lexical_index_path (str): Optional path to save the BM25 index over the recommender input text (.npz)
+        coded_lists_dir (str): Optional directory to save the sciVoc topics and legal titles of each project
+            as coded CSR arrays (scivoc_topics.npz and legal_titles.npz)
+        backend (str): "pandas", or "polars" to run preprocess_lazy() as one lazy plan over the scanned CSVs
     """
-
-    project_df = pd.read_csv(project_path)
-    org_df = pd.read_csv(org_path)
-    scivoc_df = pd.read_csv(scivoc_path)
-    topics_df = pd.read_csv(topics_path)
-    legal_df = pd.read_csv(legal_path)
-    programme_df = pd.read_csv(programme_path)
-
-    processed_df = preprocess(project_df, org_df, scivoc_df, topics_df, legal_df, programme_df)
+    if backend not in ("pandas", "polars"):
+        raise ValueError(f"Unknown preprocessing backend: {backend}")
+
+    if backend == "polars":
+        with timed("preprocess.lazy"):
+            tables = scan_raw_tables(project_path, org_path, scivoc_path, topics_path, legal_path, programme_path)
+            processed_df = preprocess_lazy(**tables)
+        # The extra outputs below still read the raw tables with pandas
+        if graph_path or cube_path or lexical_index_path or coded_lists_dir:
+            org_df = pd.read_csv(org_path)
+            scivoc_df = pd.read_csv(scivoc_path)
+            legal_df = pd.read_csv(legal_path)
+    else:
+        project_df = pd.read_csv(project_path)
+        org_df = pd.read_csv(org_path)
+        scivoc_df = pd.read_csv(scivoc_path)
+        topics_df = pd.read_csv(topics_path)
+        legal_df = pd.read_csv(legal_path)
+        programme_df = pd.read_csv(programme_path)
+
+        processed_df = preprocess(project_df, org_df, scivoc_df, topics_df, legal_df, programme_df)
 
     processed_df.to_csv(output_path, index=False)
     logger.info(f"Processed data saved to: {output_path}")
+
+    if graph_path:
+        with timed("preprocess.coparticipation_graph"):
+            incidence, org_ids, project_ids = org_project_incidence(org_df, processed_df)
+            adjacency = coparticipation_adjacency(incidence)
+            save_coparticipation_graph(graph_path, incidence, adjacency, org_ids, project_ids)
+        logger.info(f"Co-participation graph saved to: {graph_path}")
+
+    if cube_path:
+        with timed("preprocess.project_feature_cube"):
+            save_project_feature_cube(cube_path, project_feature_cube(processed_df, org_df))
+        logger.info(f"Project feature cube saved to: {cube_path}")
+
+    if lexical_index_path:
+        with timed("preprocess.bm25_index"):
+            input_text = format_input_text(processed_df, scivoc_codes(scivoc_df))
+            save_bm25_index(lexical_index_path, build_bm25_index(processed_df[PROJECT_ID], input_text))
+        logger.info(f"BM25 index saved to: {lexical_index_path}")
+
+    if coded_lists_dir:
+        with timed("preprocess.coded_lists"):
+            os.makedirs(coded_lists_dir, exist_ok=True)
+            scivoc_codes(scivoc_df).save(os.path.join(coded_lists_dir, "scivoc_topics.npz"))
+            legal_codes(cast_legal_df_dtypes(legal_df)).save(os.path.join(coded_lists_dir, "legal_titles.npz"))
+        logger.info(f"Coded sciVoc topics and legal titles saved to: {coded_lists_dir}")
+
+    METRICS.log_summary()
@@ -1,9 +1,12 @@
+import re
 from collections import defaultdict
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 import numpy as np
 import pandas as pd
+from scipy import sparse
 
+from modern_data_analytics.config import BM25_B, BM25_K1, BM25_MAX_DF_RATIO, ROLE_WEIGHTS
 from modern_data_analytics.constants import (
     ACTIVITY_TYPE,
     ASSOCIATED_PARTNER,
@@ -16,6 +19,7 @@ from modern_data_analytics.constants import (
     CORDIS_PROJECT_URL,
     COUNTRY,
     DURATION_YEARS,
+    EC_MAX_CONTRIBUTION,
     EC_SIGNATURE_DATE,
     END_DATE,
     EURO_SCIVOC_TITLE,
@@ -48,6 +52,10 @@ from modern_data_analytics.constants import (
     TOPICS,
     TOTAL_COST,
 )
+from modern_data_analytics.preprocessing.coded import CodedLists
+
+# word tokens of the lexical index, hyphenated programme and topic codes are kept whole
+LEXICAL_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
 
 
 def cast_dtype(df: pd.DataFrame, columns: list, target_dtype: str) -> pd.DataFrame:
@@ -120,13 +128,23 @@ def scivoc_summary(scivoc_df: pd.DataFrame) -> pd.DataFrame:
     if not required_columns.issubset(scivoc_df.columns):
         raise ValueError(f"Scivoc DataFrame must contain the columns: {required_columns}")
 
-    scivoc_summary = scivoc_df.groupby(PROJECT_ID, as_index=False)[EURO_SCIVOC_TITLE].agg(list)
-
-    scivoc_summary = scivoc_summary.rename(columns={EURO_SCIVOC_TITLE: SCIVOC_TOPICS})
-    scivoc_summary[SCIVOC_TOPICS] = scivoc_summary[SCIVOC_TOPICS].apply(lambda x: x if isinstance(x, list) else [])
+    scivoc_summary = scivoc_codes(scivoc_df).to_frame(PROJECT_ID, SCIVOC_TOPICS)
     return scivoc_summary
 
 
+def scivoc_codes(scivoc_df: pd.DataFrame) -> CodedLists:
+    """
+    Code the sciVoc topics of each project as CSR arrays over a topic vocabulary, in the order of scivoc_summary()
+
+    Args:
+        scivoc_df (pd.DataFrame): Scivoc DataFrame
+
+    Returns:
+        CodedLists: sciVoc topics of every project with at least one topic
+    """
+    return CodedLists.from_long(scivoc_df, PROJECT_ID, EURO_SCIVOC_TITLE)
+
+
 def legal_summary(legal_df: pd.DataFrame) -> pd.DataFrame:
     """
     Summarizes legal titles for each projectID in the Legal Basis DataFrame.
@@ -143,16 +161,26 @@ def legal_summary(legal_df: pd.DataFrame) -> pd.DataFrame:
     if not required_columns.issubset(legal_df.columns):
         raise ValueError(f"Legal DataFrame must contain the columns: {required_columns}")
 
-    legal_summary = (
-        legal_df.dropna(subset=[TITLE_LEGAL])
-        .groupby(PROJECT_ID, as_index=False)[TITLE_LEGAL]
-        .apply(lambda x: sorted(set(x)))
-    )
-
-    legal_summary[N_TITLE_LEGALS] = legal_summary[TITLE_LEGAL].str.len()
+    coded = legal_codes(legal_df)
+    legal_summary = coded.to_frame(PROJECT_ID, TITLE_LEGAL)
+    legal_summary[N_TITLE_LEGALS] = coded.lengths()
     return legal_summary
 
 
+def legal_codes(legal_df: pd.DataFrame) -> CodedLists:
+    """
+    Code the distinct legal titles of each project as CSR arrays over a title vocabulary, sorted as in
+    legal_summary()
+
+    Args:
+        legal_df (pd.DataFrame): Legal Basis DataFrame
+
+    Returns:
+        CodedLists: legal titles of every project with at least one title
+    """
+    return CodedLists.from_long(legal_df, PROJECT_ID, TITLE_LEGAL, unique=True, sort=True)
+
+
 def org_summary(org_df: pd.DataFrame) -> pd.DataFrame:
     """
     Summarizes project information for each organisation.
@@ -332,20 +360,294 @@ def merge_full_df_with_programme(full_df: pd.DataFrame, programme_df: pd.DataFra
     return full_merged_df
 
 
-def format_input_text(full_df: pd.DataFrame) -> pd.Series:
+def format_input_text(full_df: pd.DataFrame, scivoc_topics: Optional[CodedLists] = None) -> pd.Series:
     """
     Format input text for recommender training by combining title, objective, and SciVoc topics
     Args:
         full_df (pd.DataFrame): Full preprocessed DataFrame
+        scivoc_topics (CodedLists): Optional result of scivoc_codes(), joined without going through the
+            list column of full_df
     Returns:
         pd.Series: Series containing formatted input text for each project
     """
+    if scivoc_topics is None:
+        topics = full_df[SCIVOC_TOPICS].apply(lambda x: " ".join(x) if isinstance(x, list) else "")
+    else:
+        topics = pd.Series(scivoc_topics.reindex(full_df[PROJECT_ID]).join(" "), index=full_df.index)
+
+    input_text = full_df[TITLE].fillna("") + " " + full_df[OBJECTIVE].fillna("") + " " + topics
+    return input_text
+
+
+def org_project_incidence(
+    org_df: pd.DataFrame, project_roles_df: pd.DataFrame
+) -> tuple[sparse.csr_matrix, np.ndarray, np.ndarray]:
+    """
+    Build the sparse organisation x project incidence matrix, weighting each participation by its role
+
+    Args:
+        org_df (pd.DataFrame): Organisation DataFrame, defining the organisation axis
+        project_roles_df (pd.DataFrame): Result of project_roles_summary(), or any DataFrame with its
+            projectID and role list columns such as the output of preprocess()
 
-    input_text = (
-        full_df[TITLE].fillna("")
-        + " "
-        + full_df[OBJECTIVE].fillna("")
-        + " "
-        + full_df[SCIVOC_TOPICS].apply(lambda x: " ".join(x) if isinstance(x, list) else "")
+    Returns:
+        tuple: CSR incidence matrix (organisations x projects) with role weights, sorted organisation ids
+        of its rows and project ids of its columns in the order of project_roles_df
+    """
+    org_ids = np.sort(org_df[ORGANISATION_ID].dropna().unique())
+    project_roles_df = project_roles_df.reset_index(drop=True)
+    project_ids = project_roles_df[PROJECT_ID].to_numpy()
+
+    rows, cols, weights = [], [], []
+    for role, weight in ROLE_WEIGHTS.items():
+        # one row per (project, organisation) membership, indexed by project position
+        members = project_roles_df[role].explode().dropna().astype(org_ids.dtype)
+        org_positions = np.minimum(np.searchsorted(org_ids, members.to_numpy()), len(org_ids) - 1)
+        known = org_ids[org_positions] == members.to_numpy()
+
+        rows.append(org_positions[known])
+        cols.append(members.index.to_numpy()[known])
+        weights.append(np.full(known.sum(), weight, dtype=np.float32))
+
+    incidence = sparse.csr_matrix(
+        (np.concatenate(weights), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(len(org_ids), len(project_ids)),
     )
-    return input_text
+    incidence.sum_duplicates()
+    return incidence, org_ids, project_ids
+
+
+def coparticipation_adjacency(incidence: sparse.csr_matrix) -> sparse.csr_matrix:
+    """
+    Derive the weighted organisation co-participation adjacency from the incidence matrix: the weight
+    between two organisations sums, over their shared projects, the product of their role weights
+
+    Args:
+        incidence (sparse.csr_matrix): Result of org_project_incidence()
+
+    Returns:
+        sparse.csr_matrix: symmetric organisations x organisations adjacency with an empty diagonal
+    """
+    adjacency = (incidence @ incidence.T).tocsr()
+    adjacency.setdiag(0)
+    adjacency.eliminate_zeros()
+    return adjacency
+
+
+def save_coparticipation_graph(
+    path: str,
+    incidence: sparse.csr_matrix,
+    adjacency: sparse.csr_matrix,
+    org_ids: np.ndarray,
+    project_ids: np.ndarray,
+) -> None:
+    """
+    Save the incidence and adjacency matrices with their id axes in a single numpy archive (.npz)
+
+    Args:
+        path (str): Path of the archive
+        incidence (sparse.csr_matrix): Result of org_project_incidence()
+        adjacency (sparse.csr_matrix): Result of coparticipation_adjacency()
+        org_ids (np.ndarray): Organisation ids of the matrix rows
+        project_ids (np.ndarray): Project ids of the incidence columns
+    """
+    np.savez(
+        path,
+        incidence_data=incidence.data,
+        incidence_indices=incidence.indices,
+        incidence_indptr=incidence.indptr,
+        adjacency_data=adjacency.data,
+        adjacency_indices=adjacency.indices,
+        adjacency_indptr=adjacency.indptr,
+        org_ids=org_ids,
+        project_ids=project_ids,
+    )
+
+
+def load_coparticipation_graph(path: str) -> tuple[sparse.csr_matrix, sparse.csr_matrix, np.ndarray, np.ndarray]:
+    """
+    Load an archive written by save_coparticipation_graph()
+
+    Args:
+        path (str): Path of the archive
+
+    Returns:
+        tuple: incidence matrix, adjacency matrix, organisation ids and project ids
+    """
+    with np.load(path) as archive:
+        org_ids = archive["org_ids"]
+        project_ids = archive["project_ids"]
+        incidence = sparse.csr_matrix(
+            (archive["incidence_data"], archive["incidence_indices"], archive["incidence_indptr"]),
+            shape=(len(org_ids), len(project_ids)),
+        )
+        adjacency = sparse.csr_matrix(
+            (archive["adjacency_data"], archive["adjacency_indices"], archive["adjacency_indptr"]),
+            shape=(len(org_ids), len(org_ids)),
+        )
+    return incidence, adjacency, org_ids, project_ids
+
+
+def project_feature_cube(full_df: pd.DataFrame, org_df: pd.DataFrame) -> dict[str, np.ndarray]:
+    """
+    Build compact per-project feature arrays for match-set statistics: categorical columns are mapped to
+    integer codes with a vocabulary, and the countries of each project are stored as CSR offsets and codes
+
+    Args:
+        full_df (pd.DataFrame): Full preprocessed project DataFrame
+        org_df (pd.DataFrame): Organisation DataFrame, providing the countries of each project
+
+    Returns:
+        dict: numpy arrays keyed by name, with "sorted_project_ids" and "sorted_positions" to map project ids
+        to array positions with a binary search
+    """
+    project_ids = full_df[PROJECT_ID].to_numpy(dtype=np.int64)
+    sort_order = np.argsort(project_ids, kind="stable")
+    cube = {
+        "project_ids": project_ids,
+        "sorted_project_ids": project_ids[sort_order],
+        "sorted_positions": sort_order,
+        "start_year": full_df[START_DATE].dt.year.fillna(-1).to_numpy(dtype=np.int16),
+        N_ORGANISATIONS: full_df[N_ORGANISATIONS].to_numpy(dtype=np.float32),
+        EC_MAX_CONTRIBUTION: full_df[EC_MAX_CONTRIBUTION].to_numpy(dtype=np.float64),
+    }
+
+    for column in [FUNDING_ID, TITLE_TOPIC]:
+        codes, vocabulary = pd.factorize(full_df[column], sort=True)
+        cube[f"{column}_codes"] = codes.astype(np.int32)
+        cube[f"{column}_vocabulary"] = np.asarray(vocabulary, dtype=str)
+
+    # Distinct countries of each project as CSR offsets into a code array
+    project_countries = org_df[[PROJECT_ID, COUNTRY]].dropna().drop_duplicates()
+    positions = pd.Index(project_ids).get_indexer(project_countries[PROJECT_ID])
+    project_countries = project_countries[positions >= 0]
+    positions = positions[positions >= 0]
+    country_codes, country_vocabulary = pd.factorize(project_countries[COUNTRY].astype(str), sort=True)
+
+    order = np.argsort(positions, kind="stable")
+    offsets = np.zeros(len(project_ids) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(positions, minlength=len(project_ids)), out=offsets[1:])
+    cube["country_offsets"] = offsets
+    cube["country_codes"] = country_codes[order].astype(np.int32)
+    cube["country_vocabulary"] = np.asarray(country_vocabulary, dtype=str)
+
+    return cube
+
+
+def save_project_feature_cube(path: str, cube: dict[str, np.ndarray]) -> None:
+    """
+    Save the result of project_feature_cube() as a numpy archive (.npz)
+
+    Args:
+        path (str): Path of the archive
+        cube (dict): Result of project_feature_cube()
+    """
+    # numpy's stubs type **kwds as possibly binding allow_pickle, the names here are array names
+    np.savez(path, **cube)  # type: ignore[arg-type]
+
+
+def tokenize_text(text: str) -> list[str]:
+    """
+    Split text into lowercase word tokens for the lexical index, keeping hyphenated codes such as
+    "HORIZON-CL5-2021" as a single token
+
+    Args:
+        text (str): Text to tokenize
+
+    Returns:
+        list: tokens in text order
+    """
+    return LEXICAL_TOKEN_PATTERN.findall(text.lower())
+
+
+def build_bm25_index(
+    project_ids: pd.Series,
+    input_text: pd.Series,
+    k1: float = BM25_K1,
+    b: float = BM25_B,
+    max_df_ratio: float = BM25_MAX_DF_RATIO,
+) -> dict[str, np.ndarray]:
+    """
+    Build a BM25 inverted index as compressed postings arrays. The BM25 weight of every (term, project)
+    posting does not depend on the query, so it is precomputed and quantised to 8 bits, and the project
+    positions of each postings list are stored as gaps in the smallest unsigned dtype that fits
+
+    Args:
+        project_ids (pd.Series): Project ids of the documents
+        input_text (pd.Series): Document texts in the same order, e.g. the output of format_input_text()
+        k1 (float): BM25 term frequency saturation
+        b (float): BM25 document length normalisation
+        max_df_ratio (float): Terms found in a larger share of the documents are dropped, their near-zero
+            weight is not worth scanning their long postings lists
+
+    Returns:
+        dict: numpy arrays keyed by name: sorted "vocabulary", postings "offsets" per term, "gaps" and
+        "impacts" per posting, the "impact_scale" to dequantise impacts and the "project_ids" of the documents
+    """
+    n_docs = len(input_text)
+    tokens = input_text.reset_index(drop=True).fillna("").str.lower().str.findall(LEXICAL_TOKEN_PATTERN)
+    tokens = tokens.explode().dropna()
+    docs = tokens.index.to_numpy(dtype=np.int64)
+    term_codes, vocabulary = pd.factorize(tokens, sort=True)
+
+    # One posting per distinct (term, document), ordered by term then document
+    postings, term_frequencies = np.unique(term_codes.astype(np.int64) * n_docs + docs, return_counts=True)
+    posting_terms, posting_docs = np.divmod(postings, n_docs)
+
+    doc_lengths = np.bincount(docs, minlength=n_docs)
+    doc_frequencies = np.bincount(posting_terms, minlength=len(vocabulary))
+    idf = np.log1p((n_docs - doc_frequencies + 0.5) / (doc_frequencies + 0.5))
+    length_norm = k1 * (1 - b + b * doc_lengths / max(doc_lengths.mean(), 1))
+    impacts = idf[posting_terms] * term_frequencies * (k1 + 1) / (term_frequencies + length_norm[posting_docs])
+
+    kept_terms = doc_frequencies <= max_df_ratio * n_docs
+    kept = kept_terms[posting_terms]
+    posting_terms, posting_docs, impacts = posting_terms[kept], posting_docs[kept], impacts[kept]
+    term_index = np.cumsum(kept_terms) - 1
+
+    offsets = np.zeros(kept_terms.sum() + 1, dtype=np.int64)
+    np.cumsum(np.bincount(term_index[posting_terms], minlength=kept_terms.sum()), out=offsets[1:])
+
+    # Document gaps restart at the first posting of every term
+    gaps = np.diff(posting_docs, prepend=0)
+    term_starts = offsets[:-1][np.diff(offsets) > 0]
+    gaps[term_starts] = posting_docs[term_starts]
+    gap_dtype = np.uint16 if len(gaps) == 0 or gaps.max() <= np.iinfo(np.uint16).max else np.uint32
+
+    impact_scale = impacts.max() / 255 if len(impacts) else 1.0
+    quantised_impacts = np.clip(np.rint(impacts / impact_scale), 1, 255).astype(np.uint8)
+
+    return {
+        "project_ids": project_ids.to_numpy(dtype=np.int64),
+        "vocabulary": np.asarray(vocabulary, dtype=str)[kept_terms],
+        "offsets": offsets,
+        "gaps": gaps.astype(gap_dtype),
+        "impacts": quantised_impacts,
+        "impact_scale": np.array(impact_scale, dtype=np.float64),
+    }
+
+
+def save_bm25_index(path: str, index: dict[str, np.ndarray]) -> None:
+    """
+    Save the result of build_bm25_index() as a numpy archive (.npz)
+
+    Args:
+        path (str): Path of the archive
+        index (dict): Result of build_bm25_index()
+    """
+    # numpy's stubs type **kwds as possibly binding allow_pickle, the names here are array names
+    np.savez(path, **index)  # type: ignore[arg-type]
+
+
+def load_bm25_index(path: str) -> dict[str, np.ndarray]:
+    """
+    Load an archive written by save_bm25_index()
+
+    Args:
+        path (str): Path of the archive
+
+    Returns:
+        dict: numpy arrays keyed by name, as returned by build_bm25_index()
+    """
+    with np.load(path) as archive:
+        return {name: archive[name] for name in archive.files}
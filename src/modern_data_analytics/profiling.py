@@ -0,0 +1,230 @@
+import datetime
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from types import CodeType, FrameType
+from typing import Iterator, Optional
+
+from loguru import logger
+
+from modern_data_analytics.config import (
+    PROFILE_DIR,
+    PROFILE_INTERVAL_S,
+    PROFILE_LATENCY_THRESHOLD_S,
+    PROFILE_SAMPLE_RATE,
+)
+from modern_data_analytics.instrumentation import METRICS, MetricsRegistry, record_stages
+
+
+def fold_stack(frame: FrameType, labels: Optional[dict[CodeType, str]] = None) -> str:
+    """
+    Fold the call stack of a frame into one line of the collapsed stack format read by flame graph tools such as
+    flamegraph.pl and speedscope: one label per frame, outermost call first, separated by semicolons
+
+    Args:
+        frame (FrameType): Innermost frame, e.g. a value of sys._current_frames()
+        labels (dict): Optional cache of the label of every code object
+
+    Returns:
+        str: folded stack
+    """
+    labels = labels if labels is not None else {}
+    stack = []
+    current: Optional[FrameType] = frame
+    while current is not None:
+        code = current.f_code
+        label = labels.get(code)
+        if label is None:
+            label = labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        stack.append(label)
+        current = current.f_back
+    return ";".join(reversed(stack))
+
+
+class RequestTrace:
+    def __init__(self, name: str, metadata: dict, sampled: bool):
+        """
+        Stack samples, stage timings and metadata of one profiled request
+
+        Args:
+            name (str): Name of the profiled entry point, e.g. "recommender.get_top_matches"
+            metadata (dict): Request attributes written with the profile, e.g. proposal_length and top_n
+            sampled (bool): Whether the request was drawn by the sample rate, otherwise it is only kept when slow
+        """
+        self.name = name
+        self.metadata = metadata
+        self.sampled = sampled
+        self.stacks: Counter = Counter()
+        self.stages: list[tuple[str, float]] = []
+        self.started_at = datetime.datetime.now()
+        self.start = time.perf_counter()
+        self.duration_s: Optional[float] = None
+        self.error: Optional[str] = None
+
+
+class RequestProfiler:
+    def __init__(
+        self,
+        output_dir: str,
+        sample_rate: float = 0.0,
+        latency_threshold_s: Optional[float] = None,
+        interval_s: float = 0.005,
+        registry: Optional[MetricsRegistry] = None,
+    ):
+        """
+        Opt-in statistical profiler of individual requests. While a request is profiled, a background thread
+        samples its call stack from sys._current_frames() every interval. A request drawn by the sample rate, or
+        slower than the latency threshold, is dumped to the output directory as folded stacks (.folded) and a
+        JSON summary with its metadata and stage timings (.json); the samples of other requests are discarded.
+        The sampler only runs while requests are profiled, and the profiler costs nothing when disabled
+
+        Args:
+            output_dir (str): Directory the profiles are written to
+            sample_rate (float): Fraction of requests profiled, 0 profiles none
+            latency_threshold_s (float): Requests at least this slow are always dumped, None disables
+            interval_s (float): Seconds between two stack samples
+            registry (MetricsRegistry): Registry counting the profiled and dumped requests, defaults to METRICS
+        """
+        self.output_dir = output_dir
+        self.sample_rate = sample_rate
+        self.latency_threshold_s = latency_threshold_s
+        self.interval_s = interval_s
+        self.registry = registry if registry is not None else METRICS
+        self._local = threading.local()
+        self._wake = threading.Condition()
+        # Traces of the requests running on each thread, guarded by _wake
+        self._active: dict[int, RequestTrace] = {}
+        self._sampler: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0 or self.latency_threshold_s is not None
+
+    @contextmanager
+    def profile(self, name: str, **metadata) -> Iterator[Optional[RequestTrace]]:
+        """
+        Profile the request running in the block. Within an already profiled request, e.g. get_top_matches()
+        called from the app's update_matches, the block belongs to the outer profile
+
+        Args:
+            name (str): Name of the profiled entry point
+            **metadata: Request attributes written with the profile, e.g. proposal_length and top_n
+
+        Yields:
+            RequestTrace: trace of the request, None when it is not profiled
+        """
+        if not self.enabled or getattr(self._local, "trace", None) is not None:
+            yield None
+            return
+
+        trace = RequestTrace(name, metadata, sampled=random.random() < self.sample_rate)
+        thread_id = threading.get_ident()
+        self._local.trace = trace
+        self._watch(thread_id, trace)
+        try:
+            with record_stages() as stages:
+                trace.stages = stages
+                yield trace
+        except BaseException as exc:
+            trace.error = repr(exc)
+            raise
+        finally:
+            duration_s = trace.duration_s = time.perf_counter() - trace.start
+            self._unwatch(thread_id)
+            self._local.trace = None
+            self._finish(trace, duration_s)
+
+    def _watch(self, thread_id: int, trace: RequestTrace) -> None:
+        with self._wake:
+            self._active[thread_id] = trace
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._run_sampler, name="request-profiler", daemon=True)
+                self._sampler.start()
+            self._wake.notify()
+
+    def _unwatch(self, thread_id: int) -> None:
+        with self._wake:
+            self._active.pop(thread_id, None)
+
+    def _run_sampler(self) -> None:
+        labels: dict[CodeType, str] = {}
+        while True:
+            with self._wake:
+                while not self._active:
+                    self._wake.wait()
+                self._sample(labels)
+            time.sleep(self.interval_s)
+
+    def _sample(self, labels: dict[CodeType, str]) -> None:
+        """
+        Add the current stack of every profiled thread to its trace, called with _wake held
+        """
+        frames = sys._current_frames()
+        for thread_id, trace in self._active.items():
+            frame = frames.get(thread_id)
+            if frame is not None:
+                trace.stacks[fold_stack(frame, labels)] += 1
+
+    def _finish(self, trace: RequestTrace, duration_s: float) -> None:
+        """
+        Dump the trace of a finished request if it was sampled or slow
+        """
+        self.registry.increment("profiler.requests")
+        slow = self.latency_threshold_s is not None and duration_s >= self.latency_threshold_s
+        if not (trace.sampled or slow):
+            return
+
+        try:
+            path = self.dump(trace, reason="slow" if slow else "sampled")
+        except OSError as exc:
+            logger.warning(f"Could not write the profile of {trace.name}: {exc}")
+            return
+        self.registry.increment("profiler.dumps")
+        logger.info(f"Profiled {trace.name} ({1000 * duration_s:.1f} ms) saved to: {path}")
+
+    def dump(self, trace: RequestTrace, reason: str) -> str:
+        """
+        Write a trace as folded stacks and a JSON summary
+
+        Args:
+            trace (RequestTrace): Trace of a finished request
+            reason (str): Why the request was dumped, "sampled" or "slow"
+
+        Returns:
+            str: path of the files without extension
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        prefix = os.path.join(self.output_dir, f"{trace.started_at:%Y%m%d-%H%M%S}-{trace.name}-{uuid.uuid4().hex[:8]}")
+        summary = {
+            "name": trace.name,
+            "reason": reason,
+            "started_at": trace.started_at.isoformat(),
+            "duration_s": trace.duration_s,
+            **trace.metadata,
+            "error": trace.error,
+            "interval_s": self.interval_s,
+            "n_samples": sum(trace.stacks.values()),
+            "stages": [{"stage": name, "seconds": seconds} for name, seconds in trace.stages],
+        }
+        folded = "".join(f"{stack} {n}\n" for stack, n in trace.stacks.most_common())
+
+        for path, content in [(prefix + ".folded", folded), (prefix + ".json", json.dumps(summary, indent=2))]:
+            with open(path + ".tmp", "w") as f:
+                f.write(content)
+            os.replace(path + ".tmp", path)
+        return prefix
+
+
+# Default profiler of the serving path, disabled unless enabled in config.py
+PROFILER = RequestProfiler(
+    PROFILE_DIR,
+    sample_rate=PROFILE_SAMPLE_RATE,
+    latency_threshold_s=PROFILE_LATENCY_THRESHOLD_S,
+    interval_s=PROFILE_INTERVAL_S,
+)
@@ -0,0 +1,321 @@
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import threading
+from typing import Callable, Optional
+
+import numpy as np
+from loguru import logger
+
+from modern_data_analytics.config import ARTIFACT_POLL_INTERVAL_S, ARTIFACTS_DIR, EMBEDDING_MODEL_NAME
+from modern_data_analytics.instrumentation import METRICS
+from modern_data_analytics.recommender.lexical import LexicalIndex, align_positions
+from modern_data_analytics.recommender.recommender import Recommender, RecommenderState
+from modern_data_analytics.recommender.search import normalise_rows
+
+MANIFEST_FILE = "manifest.json"
+CURRENT_FILE = "CURRENT"
+PROJECT_IDS_FILE = "project_ids.pkl"
+PROJECT_EMBEDDINGS_FILE = "project_embeddings.npy"
+ORG_IDS_FILE = "org_ids.pkl"
+ORG_EMBEDDINGS_FILE = "org_embeddings.npy"
+LEXICAL_INDEX_FILE = "lexical_index.npz"
+
+
+def file_checksum(path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    SHA-256 hex digest of a file, read in chunks
+
+    Args:
+        path (str): Path of the file
+        chunk_size (int): Number of bytes read at a time
+
+    Returns:
+        str: hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_atomic(path: str, content: str) -> None:
+    """
+    Write a text file through a temporary file and a rename, so readers never see it half written
+    """
+    with open(path + ".tmp", "w") as f:
+        f.write(content)
+    os.replace(path + ".tmp", path)
+
+
+def publish_artifacts(
+    root: str,
+    version: str,
+    project_ids_path: str,
+    project_embeddings_path: str,
+    org_ids_path: Optional[str] = None,
+    org_embeddings_path: Optional[str] = None,
+    lexical_index_path: Optional[str] = None,
+    model_name: str = EMBEDDING_MODEL_NAME,
+) -> str:
+    """
+    Copy embedding artifacts into a new version directory with a manifest, then point CURRENT at it.
+    The directory is staged under a temporary name and renamed, so watchers only ever see complete versions
+
+    Args:
+        root (str): Directory holding the versions, e.g. models/versions
+        version (str): Name of the new version
+        project_ids_path (str): Path of the pickled project ids
+        project_embeddings_path (str): Path of the project embeddings numpy binary
+        org_ids_path (str): Optional path of the pickled organisation ids
+        org_embeddings_path (str): Optional path of the organisation embeddings numpy binary
+        lexical_index_path (str): Optional path of the BM25 index archive
+        model_name (str): Name of the encoder the embeddings were computed with
+
+    Returns:
+        str: path of the version directory
+    """
+    version_dir = os.path.join(root, version)
+    if os.path.exists(version_dir):
+        raise FileExistsError(f"Artifact version {version} already exists in {root}")
+
+    with open(project_ids_path, "rb") as f:
+        row_count = len(pickle.load(f))
+    n_embeddings = np.load(project_embeddings_path, mmap_mode="r").shape[0]
+    if n_embeddings != row_count:
+        raise ValueError(f"{row_count} project ids for {n_embeddings} project embeddings")
+
+    sources = {PROJECT_IDS_FILE: project_ids_path, PROJECT_EMBEDDINGS_FILE: project_embeddings_path}
+    if org_ids_path and org_embeddings_path:
+        sources.update({ORG_IDS_FILE: org_ids_path, ORG_EMBEDDINGS_FILE: org_embeddings_path})
+    if lexical_index_path:
+        sources[LEXICAL_INDEX_FILE] = lexical_index_path
+
+    staging_dir = os.path.join(root, f".{version}.tmp")
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    os.makedirs(staging_dir)
+    checksums = {}
+    for name, source in sources.items():
+        shutil.copyfile(source, os.path.join(staging_dir, name))
+        checksums[name] = file_checksum(os.path.join(staging_dir, name))
+
+    manifest = {
+        "version": version,
+        "model_name": model_name,
+        "row_count": row_count,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "checksums": checksums,
+    }
+    with open(os.path.join(staging_dir, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    os.rename(staging_dir, version_dir)
+    _write_atomic(os.path.join(root, CURRENT_FILE), version)
+    logger.info(f"Published artifact version {version} ({row_count} projects) to: {version_dir}")
+    return version_dir
+
+
+def current_version(root: str) -> Optional[str]:
+    """
+    Version CURRENT points at, or None if nothing was published yet
+    """
+    try:
+        with open(os.path.join(root, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def read_manifest(version_dir: str, verify: bool = True) -> dict:
+    """
+    Read the manifest of a version directory and optionally check the files against its checksums
+
+    Args:
+        version_dir (str): Path of the version directory
+        verify (bool): Whether to recompute and compare the checksums
+
+    Returns:
+        dict: the manifest
+    """
+    with open(os.path.join(version_dir, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    if verify:
+        for name, checksum in manifest["checksums"].items():
+            if file_checksum(os.path.join(version_dir, name)) != checksum:
+                raise ValueError(f"Checksum mismatch for {name} in {version_dir}")
+    return manifest
+
+
+def load_artifact_state(version_dir: str, recommender: Recommender) -> RecommenderState:
+    """
+    Fully load and validate a version into a new RecommenderState, without touching the state in use.
+    The encoder is reused unless the manifest names another model, which is then loaded and warmed up here.
+    The lexical index and organisation embeddings in use are kept unless the version ships its own
+
+    Args:
+        version_dir (str): Path of the version directory
+        recommender (Recommender): Recommender the state is built for
+
+    Returns:
+        RecommenderState: state ready for Recommender.swap_state()
+
+    Raises:
+        ValueError: if the version does not match its manifest, or changes the model without shipping
+            organisation embeddings to replace those in use
+    """
+    manifest = read_manifest(version_dir)
+
+    with open(os.path.join(version_dir, PROJECT_IDS_FILE), "rb") as f:
+        project_ids = pickle.load(f)
+    project_embeddings = np.load(os.path.join(version_dir, PROJECT_EMBEDDINGS_FILE))
+    if len(project_ids) != manifest["row_count"] or project_embeddings.shape[0] != manifest["row_count"]:
+        raise ValueError(f"Row count of {version_dir} does not match its manifest")
+
+    org_ids: Optional[list[int]]
+    org_embeddings: Optional[np.ndarray]
+    if ORG_IDS_FILE in manifest["checksums"]:
+        with open(os.path.join(version_dir, ORG_IDS_FILE), "rb") as f:
+            org_ids = pickle.load(f)
+        org_embeddings = normalise_rows(np.load(os.path.join(version_dir, ORG_EMBEDDINGS_FILE)))
+    elif recommender.org_ids is not None and manifest["model_name"] != recommender.model_name:
+        # Embeddings of another model are not comparable with the new proposal embeddings
+        raise ValueError(f"{version_dir} changes the model to {manifest['model_name']} without organisation embeddings")
+    else:
+        org_ids, org_embeddings = recommender.org_ids, recommender.org_embeddings
+
+    lexical_index = recommender.lexical_index
+    if LEXICAL_INDEX_FILE in manifest["checksums"]:
+        lexical_index = LexicalIndex(os.path.join(version_dir, LEXICAL_INDEX_FILE))
+    lexical_positions = None if lexical_index is None else align_positions(lexical_index.project_ids, project_ids)
+
+    if manifest["model_name"] == recommender.model_name:
+        model = recommender.model
+    else:
+        model = recommender.load_encoder(manifest["model_name"])
+        # First call initialises lazy buffers, keep it off the request path
+        model.encode(["warm up"])
+
+    return RecommenderState(
+        model=model,
+        model_name=manifest["model_name"],
+        project_ids=project_ids,
+        project_embeddings=project_embeddings,
+        normalised_embeddings=normalise_rows(project_embeddings),
+        org_ids=org_ids,
+        org_embeddings=org_embeddings,
+        lexical_index=lexical_index,
+        lexical_positions=lexical_positions,
+        version=manifest["version"],
+    )
+
+
+class ArtifactWatcher:
+    def __init__(
+        self,
+        root: str,
+        recommender: Recommender,
+        interval_s: float = ARTIFACT_POLL_INTERVAL_S,
+        on_swap: Optional[Callable[[str], None]] = None,
+    ):
+        """
+        Poll an artifact root for a new CURRENT version, load it in the background and swap it into the recommender
+
+        Args:
+            root (str): Directory holding the versions, e.g. models/versions
+            recommender (Recommender): Recommender whose state is swapped
+            interval_s (float): Seconds between two checks
+            on_swap (Callable): Optional callback receiving the new version after each swap
+        """
+        self.root = root
+        self.recommender = recommender
+        self.interval_s = interval_s
+        self.on_swap = on_swap
+        self._failed: set[str] = set()
+        self._stop = threading.Event()
+
+    def check(self) -> bool:
+        """
+        Swap in the CURRENT version if it differs from the recommender's
+
+        Returns:
+            bool: whether a new version was swapped in
+        """
+        version = current_version(self.root)
+        if version is None or version == self.recommender.version or version in self._failed:
+            return False
+
+        try:
+            state = load_artifact_state(os.path.join(self.root, version), self.recommender)
+        except Exception as e:
+            # Keep serving the loaded version and do not retry a broken one on every poll
+            logger.error(f"Could not load artifact version {version}: {e}")
+            self._failed.add(version)
+            METRICS.increment("artifacts.failed_loads")
+            return False
+
+        previous = self.recommender.swap_state(state)
+        logger.info(f"Swapped artifact version {previous.version} for {version}")
+        METRICS.increment("artifacts.swaps")
+        if self.on_swap is not None:
+            self.on_swap(version)
+        return True
+
+    def start(self) -> threading.Thread:
+        """
+        Start polling in a daemon thread
+
+        Returns:
+            threading.Thread: the started thread
+        """
+
+        def run() -> None:
+            while not self._stop.wait(self.interval_s):
+                try:
+                    self.check()
+                except Exception:
+                    # Keep the loaded version and keep polling, e.g. when the CURRENT pointer cannot be read
+                    logger.exception(f"Artifact check of {self.root} failed")
+                    METRICS.increment("artifacts.failed_checks")
+
+        thread = threading.Thread(target=run, name="artifact-watcher", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        """
+        Stop polling after the current check
+        """
+        self._stop.set()
+
+
+def cli() -> None:
+    """
+    Command-line entry point publishing a new artifact version
+    """
+    parser = argparse.ArgumentParser(description="Publish embedding artifacts as a new version watched by the app")
+    parser.add_argument("version", help="name of the new version, e.g. 2025-06-01")
+    parser.add_argument("--root", default=ARTIFACTS_DIR)
+    parser.add_argument("--project-ids-path", default="models/project_ids.pkl")
+    parser.add_argument("--project-embeddings-path", default="models/project_embeddings.npy")
+    parser.add_argument("--org-ids-path", default="models/org_ids.pkl")
+    parser.add_argument("--org-embeddings-path", default="models/org_embeddings.npy")
+    parser.add_argument("--lexical-index-path", default="models/lexical_index.npz")
+    parser.add_argument("--model-name", default=EMBEDDING_MODEL_NAME)
+    args = parser.parse_args()
+
+    os.makedirs(args.root, exist_ok=True)
+    publish_artifacts(
+        root=args.root,
+        version=args.version,
+        project_ids_path=args.project_ids_path,
+        project_embeddings_path=args.project_embeddings_path,
+        org_ids_path=args.org_ids_path if os.path.exists(args.org_ids_path) else None,
+        org_embeddings_path=args.org_embeddings_path if os.path.exists(args.org_embeddings_path) else None,
+        lexical_index_path=args.lexical_index_path if os.path.exists(args.lexical_index_path) else None,
+        model_name=args.model_name,
+    )
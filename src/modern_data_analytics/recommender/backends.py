@@ -0,0 +1,124 @@
+import os
+from typing import Optional
+
+import numpy as np
+import torch
+from loguru import logger
+from sentence_transformers import SentenceTransformer
+
+from modern_data_analytics.config import EMBEDDING_MODEL_NAME, ENCODER_MAX_DRIFT, ENCODER_MIN_RECALL
+from modern_data_analytics.recommender.search import cosine_scores, normalise_rows, top_k_indices
+
+FP32 = "fp32"
+INT8 = "int8"
+ENCODER_BACKENDS = (FP32, INT8)
+
+
+def available_cpus() -> int:
+    """
+    Number of CPUs this process may run on, which can be lower than os.cpu_count() in a container
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def configure_threads(num_threads: Optional[int] = None) -> int:
+    """
+    Tune torch's CPU thread pools for single-query latency: one intra-op thread per available CPU and a
+    single inter-op thread, since the encoder runs one sequential stack of layers. The pools are shared by the
+    whole process, so call this once at startup, before the first encoder runs
+
+    Args:
+        num_threads (int): Number of intra-op threads, defaults to the number of available CPUs
+
+    Returns:
+        int: number of intra-op threads in use
+    """
+    num_threads = num_threads or available_cpus()
+    torch.set_num_threads(num_threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # The inter-op pool can only be sized before its first use
+        logger.warning("torch inter-op thread pool already started, keeping its size")
+    torch.set_flush_denormal(True)
+    return num_threads
+
+
+def load_encoder(backend: str = FP32, model_name: str = EMBEDDING_MODEL_NAME) -> SentenceTransformer:
+    """
+    Load the sentence transformer on CPU with the given inference backend. The thread pools are left as they
+    are, see configure_threads()
+
+    Args:
+        backend (str): "fp32" for the stock model or "int8" for dynamic int8 quantisation of the linear layers
+        model_name (str): Name of the sentence transformer model
+
+    Returns:
+        SentenceTransformer: encoder in inference mode
+    """
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError(f"Unknown encoder backend {backend!r}, expected one of {ENCODER_BACKENDS}")
+
+    model = SentenceTransformer(model_name, device="cpu")
+    model.eval()
+    if backend == INT8:
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    logger.info(f"Loaded encoder {model_name} with backend {backend} on {torch.get_num_threads()} threads")
+    return model
+
+
+def validate_encoder(
+    candidate: SentenceTransformer,
+    reference: SentenceTransformer,
+    texts: list[str],
+    corpus_embeddings: np.ndarray,
+    k: int = 10,
+    max_drift: float = ENCODER_MAX_DRIFT,
+    min_recall: float = ENCODER_MIN_RECALL,
+) -> dict:
+    """
+    Compare a candidate encoder against the stock model: the cosine drift of the query embeddings and the
+    recall@k of the projects retrieved from the stock corpus embeddings. Validate on real project objectives,
+    the drift of a quantised encoder depends on the vocabulary it is given
+
+    Args:
+        candidate (SentenceTransformer): Encoder under test
+        reference (SentenceTransformer): Stock fp32 encoder
+        texts (list): Query texts, e.g. project objectives or proposals
+        corpus_embeddings (np.ndarray): (n, d) project embeddings computed with the stock encoder
+        k (int): Number of retrieved projects compared per query
+        max_drift (float): Highest accepted mean embedding drift
+        min_recall (float): Lowest accepted mean recall@k
+
+    Returns:
+        dict: mean and max embedding drift (1 - cosine similarity) and mean and min recall@k
+
+    Raises:
+        ValueError: if the mean drift or the mean recall@k misses its floor
+    """
+    reference_vecs = normalise_rows(reference.encode(texts))
+    candidate_vecs = normalise_rows(candidate.encode(texts))
+    drift = 1 - np.sum(reference_vecs * candidate_vecs, axis=1)
+
+    normalised_corpus = normalise_rows(corpus_embeddings)
+    reference_top = top_k_indices(cosine_scores(reference_vecs, normalised_corpus), k)
+    candidate_top = top_k_indices(cosine_scores(candidate_vecs, normalised_corpus), k)
+    recall = np.array(
+        [len(np.intersect1d(ref, cand)) / k for ref, cand in zip(reference_top, candidate_top)], dtype=np.float64
+    )
+
+    metrics = {
+        "mean_drift": float(drift.mean()),
+        "max_drift": float(drift.max()),
+        f"mean_recall_at_{k}": float(recall.mean()),
+        f"min_recall_at_{k}": float(recall.min()),
+    }
+    if metrics["mean_drift"] > max_drift or metrics[f"mean_recall_at_{k}"] < min_recall:
+        raise ValueError(
+            f"Encoder misses the validation floors (mean drift <= {max_drift}, mean recall@{k} >= {min_recall}): "
+            f"{metrics}"
+        )
+    return metrics
@@ -0,0 +1,95 @@
+import numpy as np
+
+from modern_data_analytics.config import BM25_MAX_QUERY_TERMS, RRF_K
+from modern_data_analytics.preprocessing.utils import load_bm25_index, tokenize_text
+from modern_data_analytics.recommender.search import top_k_indices
+
+
+class LexicalIndex:
+    def __init__(self, index_path: str):
+        """
+        Load a BM25 inverted index written by save_bm25_index() to retrieve projects sharing rare terms,
+        acronyms or programme codes with a proposal
+
+        Args:
+            index_path (str): Path of the index archive (.npz)
+        """
+        index = load_bm25_index(index_path)
+        self.project_ids = index["project_ids"]
+        self._offsets = index["offsets"]
+        self._gaps = index["gaps"]
+        self._impacts = index["impacts"]
+        self._impact_scale = float(index["impact_scale"])
+        self._term_index = {term: i for i, term in enumerate(index["vocabulary"].tolist())}
+
+    def search(self, text: str, top_n: int, max_terms: int = BM25_MAX_QUERY_TERMS) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Score the documents containing the rarest indexed terms of the text with BM25, touching only their postings
+
+        Args:
+            text (str): Query text, e.g. a research proposal
+            top_n (int): Number of documents to return
+            max_terms (int): Number of query terms with the shortest postings lists that are looked up,
+                the common terms of long proposals are left to the dense ranking
+
+        Returns:
+            tuple: document positions (rows of project_ids) and BM25 scores, best first
+        """
+        terms = np.array(
+            [self._term_index[token] for token in set(tokenize_text(text)) if token in self._term_index], dtype=np.int64
+        )
+        if len(terms) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+        starts = self._offsets[terms]
+        lengths = self._offsets[terms + 1] - starts
+        if len(terms) > max_terms:
+            rarest = np.argpartition(lengths, max_terms - 1)[:max_terms]
+            starts, lengths = starts[rarest], lengths[rarest]
+
+        # Gather the postings of every term, then decode the gaps with one cumsum restarted at each term
+        segment_starts = np.cumsum(lengths) - lengths
+        index = np.arange(lengths.sum()) - np.repeat(segment_starts - starts, lengths)
+        gaps = self._gaps[index].astype(np.int64)
+        docs = np.cumsum(gaps)
+        docs -= np.repeat(docs[segment_starts] - gaps[segment_starts], lengths)
+
+        scores = np.bincount(docs, weights=self._impacts[index], minlength=len(self.project_ids))
+        best = top_k_indices(scores[np.newaxis, :], min(top_n, np.count_nonzero(scores)))[0]
+        return best, scores[best] * self._impact_scale
+
+
+def align_positions(index_project_ids: np.ndarray, project_ids: list[int]) -> np.ndarray:
+    """
+    Map the documents of a lexical index to rows of the project embeddings
+
+    Args:
+        index_project_ids (np.ndarray): Project ids of the index documents
+        project_ids (list): Project ids of the embedding rows
+
+    Returns:
+        np.ndarray: embedding row of every index document, -1 for projects without an embedding
+    """
+    embedding_ids = np.asarray(project_ids, dtype=np.int64)
+    order = np.argsort(embedding_ids, kind="stable")
+    found = np.minimum(np.searchsorted(embedding_ids[order], index_project_ids), len(order) - 1)
+    return np.where(embedding_ids[order][found] == index_project_ids, order[found], -1)
+
+
+def reciprocal_rank_fusion(rankings: list[np.ndarray], top_n: int, k: int = RRF_K) -> np.ndarray:
+    """
+    Fuse rankings of the same items by summing 1 / (k + rank) over the rankings each item appears in
+
+    Args:
+        rankings (list): Arrays of item ids, best first
+        top_n (int): Number of fused items to return
+        k (int): Rank offset damping the weight of the first ranks
+
+    Returns:
+        np.ndarray: item ids, best fused score first
+    """
+    items = np.concatenate(rankings)
+    ranks = np.concatenate([np.arange(1, len(ranking) + 1) for ranking in rankings])
+    fused_items, inverse = np.unique(items, return_inverse=True)
+    fused_scores = np.bincount(inverse, weights=1.0 / (k + ranks))
+    return fused_items[top_k_indices(fused_scores[np.newaxis, :], top_n)[0]]
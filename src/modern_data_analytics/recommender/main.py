@@ -0,0 +1,246 @@
+import argparse
+import json
+import os
+import pickle
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Iterator, Optional
+
+import pandas as pd
+from loguru import logger
+
+from modern_data_analytics.config import ENCODER_NUM_THREADS, TUNE_THREADS
+from modern_data_analytics.constants import (
+    ACRONYM,
+    CORDIS_PROJECT_URL,
+    EC_MAX_CONTRIBUTION,
+    FUNDING_ID,
+    PROJECT_ID,
+    SIMILARITY,
+    TITLE,
+    TITLE_TOPIC,
+)
+from modern_data_analytics.instrumentation import METRICS, timed
+from modern_data_analytics.recommender.backends import configure_threads
+from modern_data_analytics.recommender.recommender import Recommender
+
+PROPOSAL_ID = "proposal_id"
+RANK = "rank"
+CHECKPOINT_FILE = "_checkpoint.json"
+DEFAULT_PROJECT_COLUMNS = [ACRONYM, TITLE, FUNDING_ID, TITLE_TOPIC, EC_MAX_CONTRIBUTION, CORDIS_PROJECT_URL]
+
+
+def read_proposal_batches(
+    proposals_path: str, batch_size: int, text_columns: list[str], id_column: Optional[str] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream proposals from a JSONL or CSV file in batches, without loading the whole file
+
+    Args:
+        proposals_path (str): Path to a .jsonl or .csv file of proposals
+        batch_size (int): Number of proposals per batch
+        text_columns (list): Columns joined with spaces to form the proposal text
+        id_column (str): Column identifying each proposal, defaults to the row number in the file
+
+    Yields:
+        pd.DataFrame: batch with proposal_id and text columns
+    """
+    if proposals_path.endswith((".jsonl", ".ndjson")):
+        reader = pd.read_json(proposals_path, lines=True, chunksize=batch_size, dtype=False)
+    elif proposals_path.endswith(".csv"):
+        reader = pd.read_csv(proposals_path, chunksize=batch_size)
+    else:
+        raise ValueError("Proposals must be a .jsonl or .csv file")
+
+    start = 0
+    with reader:
+        for chunk in reader:
+            missing_columns = set(text_columns) - set(chunk.columns)
+            if missing_columns:
+                raise ValueError(f"Proposal file does not contain the columns: {missing_columns}")
+
+            text = chunk[text_columns[0]].fillna("").astype(str)
+            for column in text_columns[1:]:
+                text = text + " " + chunk[column].fillna("").astype(str)
+
+            ids = chunk[id_column].astype(str) if id_column else pd.Series(range(start, start + len(chunk))).astype(str)
+            yield pd.DataFrame({PROPOSAL_ID: ids.to_numpy(), "text": text.to_numpy()})
+            start += len(chunk)
+
+
+def _load_checkpoint(output_dir: str, batch_size: int) -> set[int]:
+    """
+    Read the indices of the batches already written by a previous run
+    """
+    checkpoint_path = os.path.join(output_dir, CHECKPOINT_FILE)
+    if not os.path.exists(checkpoint_path):
+        return set()
+
+    with open(checkpoint_path) as f:
+        checkpoint = json.load(f)
+    if checkpoint["batch_size"] != batch_size:
+        raise ValueError(f"Cannot resume: checkpoint was written with batch_size={checkpoint['batch_size']}")
+
+    # only trust batches whose part file is on disk
+    return {batch for batch in checkpoint["completed_batches"] if os.path.exists(_part_path(output_dir, batch))}
+
+
+def _save_checkpoint(output_dir: str, batch_size: int, completed: set[int]) -> None:
+    """
+    Atomically record the completed batch indices
+    """
+    checkpoint_path = os.path.join(output_dir, CHECKPOINT_FILE)
+    tmp_path = checkpoint_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"batch_size": batch_size, "completed_batches": sorted(completed)}, f)
+    os.replace(tmp_path, checkpoint_path)
+
+
+def _part_path(output_dir: str, batch: int) -> str:
+    return os.path.join(output_dir, f"part-{batch:06d}.parquet")
+
+
+def match_batch(
+    recommender: Recommender, proposals: pd.DataFrame, project_df: pd.DataFrame, top_n: int
+) -> pd.DataFrame:
+    """
+    Match a batch of proposals and join the matches to the project table
+
+    Args:
+        recommender (Recommender): Recommender with loaded project embeddings
+        proposals (pd.DataFrame): Batch from read_proposal_batches()
+        project_df (pd.DataFrame): Project table indexed by projectID
+        top_n (int): Number of matches per proposal
+
+    Returns:
+        pd.DataFrame: one row per (proposal, match) with rank, similarity and project columns
+    """
+    matches = recommender.get_top_matches_batch(proposals["text"].tolist(), top_n=top_n)
+
+    records = [
+        (proposal_id, rank, project_id, similarity)
+        for proposal_id, proposal_matches in zip(proposals[PROPOSAL_ID], matches)
+        for rank, (project_id, similarity) in enumerate(proposal_matches, start=1)
+    ]
+    match_df = pd.DataFrame.from_records(records, columns=[PROPOSAL_ID, RANK, PROJECT_ID, SIMILARITY])
+
+    return match_df.join(project_df, on=PROJECT_ID)
+
+
+def main(
+    proposals_path: str,
+    project_path: str,
+    project_ids_path: str,
+    project_embeddings_path: str,
+    output_dir: str,
+    text_columns: list[str],
+    id_column: Optional[str] = None,
+    top_n: int = 10,
+    batch_size: int = 256,
+    n_workers: int = 2,
+    project_columns: Optional[list[str]] = None,
+) -> None:
+    """
+    Main function to match a large proposal file against the Horizon projects, writing one Parquet part
+    file per batch. Completed batches are checkpointed, so an interrupted run resumes where it stopped,
+    and at most 2 * n_workers batches are held in memory at once.
+
+    Args:
+        proposals_path (str): Path to a .jsonl or .csv file of proposals
+        project_path (str): Path to the processed project CSV
+        project_ids_path (str): Path to the pickled project ids of the embeddings
+        project_embeddings_path (str): Path to the project embeddings numpy binary
+        output_dir (str): Directory to write the Parquet part files and checkpoint into
+        text_columns (list): Proposal columns joined to form the proposal text
+        id_column (str): Proposal column identifying each proposal, defaults to the row number
+        top_n (int): Number of matches per proposal
+        batch_size (int): Number of proposals per batch
+        n_workers (int): Number of batches matched concurrently
+        project_columns (list): Project columns joined to the matches
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    completed = _load_checkpoint(output_dir, batch_size)
+    if completed:
+        logger.info(f"Resuming: {len(completed)} batches already written to {output_dir}")
+
+    project_columns = project_columns or DEFAULT_PROJECT_COLUMNS
+    project_df = pd.read_csv(project_path, usecols=[PROJECT_ID, *project_columns]).set_index(PROJECT_ID)
+    # Keep one row per project, so the join gives every match one output row
+    duplicated = project_df.index.duplicated()
+    if duplicated.any():
+        logger.warning(f"Dropping {duplicated.sum()} duplicate project rows of {project_path}")
+        project_df = project_df[~duplicated]
+
+    with open(project_ids_path, "rb") as f:
+        project_ids = pickle.load(f)
+    recommender = Recommender()
+    recommender.load_pretrained_project_embeddings(project_ids, project_embeddings_path)
+
+    def process(batch: int, proposals: pd.DataFrame) -> int:
+        with timed("bulk.batch"):
+            result = match_batch(recommender, proposals, project_df, top_n)
+            part_path = _part_path(output_dir, batch)
+            result.to_parquet(part_path + ".tmp", index=False)
+            os.replace(part_path + ".tmp", part_path)
+        METRICS.increment("bulk.proposals", len(proposals))
+        return batch
+
+    def collect(futures: set[Future], block_until: int) -> set[Future]:
+        while len(futures) > block_until:
+            done, futures = wait(futures, return_when=FIRST_COMPLETED)
+            failed = [future for future in done if future.exception() is not None]
+            completed.update(future.result() for future in done if future.exception() is None)
+            # Checkpoint the batches written alongside a failed one before raising its error
+            _save_checkpoint(output_dir, batch_size, completed)
+            logger.info(f"{len(completed)} batches written")
+            for future in failed:
+                future.result()
+        return futures
+
+    pending: set[Future] = set()
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        for batch, proposals in enumerate(read_proposal_batches(proposals_path, batch_size, text_columns, id_column)):
+            if batch in completed:
+                continue
+            pending.add(executor.submit(process, batch, proposals))
+            pending = collect(pending, block_until=2 * n_workers)
+        collect(pending, block_until=0)
+
+    logger.info(f"Matches of {proposals_path} saved to: {output_dir}")
+    METRICS.log_summary()
+
+
+def cli() -> None:
+    """
+    Command-line entry point of the bulk proposal matching job
+    """
+    parser = argparse.ArgumentParser(description="Match a JSONL/CSV file of proposals against the Horizon projects")
+    parser.add_argument("proposals_path", help="path to a .jsonl or .csv file of proposals")
+    parser.add_argument("output_dir", help="directory for the Parquet part files and checkpoint")
+    parser.add_argument("--project-path", default="data/processed/project_merged.csv")
+    parser.add_argument("--project-ids-path", default="models/project_ids.pkl")
+    parser.add_argument("--project-embeddings-path", default="models/project_embeddings.npy")
+    parser.add_argument("--text-columns", nargs="+", default=["text"], help="columns joined into the proposal text")
+    parser.add_argument("--id-column", help="column identifying each proposal, defaults to the row number")
+    parser.add_argument("--top-n", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    if TUNE_THREADS:
+        configure_threads(ENCODER_NUM_THREADS)
+    main(
+        proposals_path=args.proposals_path,
+        project_path=args.project_path,
+        project_ids_path=args.project_ids_path,
+        project_embeddings_path=args.project_embeddings_path,
+        output_dir=args.output_dir,
+        text_columns=args.text_columns,
+        id_column=args.id_column,
+        top_n=args.top_n,
+        batch_size=args.batch_size,
+        n_workers=args.workers,
+    )
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,108 @@
+import argparse
+import pickle
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+from scipy import sparse
+
+from modern_data_analytics.config import ROLE_WEIGHTS
+from modern_data_analytics.constants import ORGANISATION_ID, PROJECT_ID, PROJECTS, ROLE
+from modern_data_analytics.instrumentation import METRICS, timed
+from modern_data_analytics.preprocessing.main import cast_org_df_dtypes
+from modern_data_analytics.preprocessing.utils import org_summary
+from modern_data_analytics.recommender.search import normalise_rows
+
+
+def org_membership_weights(
+    org_summary_df: pd.DataFrame, project_ids: list[int]
+) -> tuple[sparse.csr_matrix, np.ndarray]:
+    """
+    Build the row-normalised organisation x project weight matrix from the project memberships in org_summary(),
+    weighting each membership by its role so every organisation's row sums to one
+
+    Args:
+        org_summary_df (pd.DataFrame): Result of org_summary(), with the list of project records per organisation
+        project_ids (list): Project ids in the order of the project embeddings
+
+    Returns:
+        tuple: CSR weight matrix (organisations x projects) and the organisation ids of its rows. Organisations
+        without any embedded project are dropped
+    """
+    memberships = org_summary_df[[ORGANISATION_ID, PROJECTS]].explode(PROJECTS).dropna(subset=[PROJECTS])
+    records = pd.DataFrame(memberships[PROJECTS].tolist(), index=memberships.index)
+
+    project_positions = pd.Index(project_ids).get_indexer(records[PROJECT_ID])
+    weights = records[ROLE].astype(str).str.strip().map(ROLE_WEIGHTS).fillna(0).to_numpy(dtype=np.float32)
+    keep = (project_positions >= 0) & (weights > 0)
+
+    org_codes, org_ids = pd.factorize(memberships[ORGANISATION_ID].to_numpy()[keep], sort=True)
+    weight_matrix = sparse.csr_matrix(
+        (weights[keep], (org_codes, project_positions[keep])), shape=(len(org_ids), len(project_ids))
+    )
+    weight_matrix.sum_duplicates()
+
+    row_sums = np.asarray(weight_matrix.sum(axis=1)).ravel()
+    weight_matrix = sparse.diags(1 / row_sums) @ weight_matrix
+    return weight_matrix.tocsr(), np.asarray(org_ids)
+
+
+def build_organisation_embeddings(
+    org_summary_df: pd.DataFrame, project_ids: list[int], project_embeddings: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Embed every organisation as the role-weighted mean of its projects' embeddings, computed as one
+    sparse x dense product of the membership weights and the project embeddings
+
+    Args:
+        org_summary_df (pd.DataFrame): Result of org_summary()
+        project_ids (list): Project ids in the order of the project embeddings
+        project_embeddings (np.ndarray): (n_projects, d) project embeddings, e.g. Recommender.project_embeddings
+
+    Returns:
+        tuple: organisation ids and the (n_organisations, d) unit-norm organisation embeddings
+    """
+    with timed("recommender.build_organisation_embeddings"):
+        weight_matrix, org_ids = org_membership_weights(org_summary_df, project_ids)
+        org_embeddings = normalise_rows(weight_matrix @ normalise_rows(project_embeddings))
+    return org_ids, org_embeddings
+
+
+def save_organisation_embeddings(
+    org_ids: np.ndarray, org_embeddings: np.ndarray, org_ids_path: str, org_embeddings_path: str
+) -> None:
+    """
+    Save organisation embeddings alongside the project embeddings, with the ids pickled as a list
+
+    Args:
+        org_ids (np.ndarray): Organisation ids of the embedding rows
+        org_embeddings (np.ndarray): Organisation embeddings
+        org_ids_path (str): Path of the pickled organisation ids, e.g. models/org_ids.pkl
+        org_embeddings_path (str): Path of the embeddings numpy binary, e.g. models/org_embeddings.npy
+    """
+    with open(org_ids_path, "wb") as f:
+        pickle.dump(org_ids.tolist(), f)
+    np.save(org_embeddings_path, org_embeddings)
+
+
+def cli() -> None:
+    """
+    Command-line entry point building the organisation embeddings from the project embeddings
+    """
+    parser = argparse.ArgumentParser(description="Embed every organisation from the embeddings of its projects")
+    parser.add_argument("--org-path", default="data/raw/organization.csv", help="path to the raw organisations CSV")
+    parser.add_argument("--project-ids-path", default="models/project_ids.pkl")
+    parser.add_argument("--project-embeddings-path", default="models/project_embeddings.npy")
+    parser.add_argument("--org-ids-path", default="models/org_ids.pkl")
+    parser.add_argument("--org-embeddings-path", default="models/org_embeddings.npy")
+    args = parser.parse_args()
+
+    with open(args.project_ids_path, "rb") as f:
+        project_ids = pickle.load(f)
+    org_summary_df = org_summary(cast_org_df_dtypes(pd.read_csv(args.org_path)))
+    org_ids, org_embeddings = build_organisation_embeddings(
+        org_summary_df, project_ids, np.load(args.project_embeddings_path)
+    )
+    save_organisation_embeddings(org_ids, org_embeddings, args.org_ids_path, args.org_embeddings_path)
+    logger.info(f"Embeddings of {len(org_ids)} organisations saved to: {args.org_embeddings_path}")
+    METRICS.log_summary()
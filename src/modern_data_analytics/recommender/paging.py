@@ -0,0 +1,83 @@
+from typing import Optional
+
+import numpy as np
+
+from modern_data_analytics.instrumentation import METRICS, timed
+from modern_data_analytics.recommender.search import top_k_indices
+
+
+class MatchCursor:
+    def __init__(
+        self,
+        project_ids: list[int],
+        query_embedding: np.ndarray,
+        scores: np.ndarray,
+        head: Optional[np.ndarray] = None,
+    ):
+        """
+        Position in the ranking of all projects for one proposal, created by Recommender.search_pages(). Only a
+        prefix of the ranking is ordered: the cursor keeps the scores of the remaining candidates and orders the
+        next best ones when a page reaches past the prefix, doubling it so that paging through k results selects
+        over the candidates O(log k) times instead of encoding and scanning again for every page.
+
+        A cursor belongs to one client and is not thread-safe. It keeps the project ids it was created with, so
+        its pages stay consistent when the recommender swaps in a new artifact version
+
+        Args:
+            project_ids (list): project ids of the embedding rows
+            query_embedding (np.ndarray): (d,) embedding of the proposal
+            scores (np.ndarray): (n_projects,) cosine similarity of the proposal with every project
+            head (np.ndarray): embedding rows ranked first, e.g. the fused dense and lexical ranking,
+                the other rows follow by cosine similarity
+        """
+        self.project_ids = project_ids
+        self.query_embedding = query_embedding
+        self.offset = 0
+        self._scores = scores
+        self._ranked = np.empty(0, dtype=np.intp) if head is None else np.asarray(head, dtype=np.intp)
+
+        rest = np.ones(len(scores), dtype=bool)
+        rest[self._ranked] = False
+        self._rest = np.flatnonzero(rest)
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    @property
+    def has_more(self) -> bool:
+        """
+        Whether next_page() has projects left to return
+        """
+        return self.offset < len(self._scores)
+
+    def _extend(self, size: int) -> None:
+        """
+        Grow the ordered prefix to at least size rows, at least doubling it, by selecting the best remaining rows
+        """
+        n_selected = min(max(size, 2 * len(self._ranked)), len(self._scores)) - len(self._ranked)
+        if n_selected <= 0:
+            return
+
+        selected = top_k_indices(self._scores[self._rest][np.newaxis, :], n_selected)[0]
+        self._ranked = np.concatenate([self._ranked, self._rest[selected]])
+        self._rest = np.delete(self._rest, selected)
+        METRICS.increment("recommender.cursor_extensions")
+
+    def next_page(self, page_size: int = 10) -> list[tuple[int, float]]:
+        """
+        Return the next projects of the ranking and move the cursor past them
+
+        Args:
+            page_size (int): Number of projects to return
+
+        Return:
+            list of (projectID, cosine similarity score) tuples, empty once the ranking is exhausted
+        """
+        with timed("recommender.next_page"):
+            end = self.offset + page_size
+            if end > len(self._ranked):
+                self._extend(end)
+            rows = self._ranked[self.offset : end]
+            self.offset += len(rows)
+
+        return [(self.project_ids[i], float(self._scores[i])) for i in rows]
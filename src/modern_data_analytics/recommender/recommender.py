@@ -1,28 +1,181 @@
+import threading
+from typing import Optional, Union
+
 import numpy as np
-from loguru import logger
 from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 
-from modern_data_analytics.config import EMBEDDING_MODEL_NAME
+from modern_data_analytics.config import EMBEDDING_MODEL_NAME, ENCODER_BACKEND, RRF_DEPTH
+from modern_data_analytics.instrumentation import METRICS, timed
+from modern_data_analytics.profiling import PROFILER
+from modern_data_analytics.recommender.backends import load_encoder
+from modern_data_analytics.recommender.lexical import LexicalIndex, align_positions, reciprocal_rank_fusion
+from modern_data_analytics.recommender.paging import MatchCursor
+from modern_data_analytics.recommender.search import cosine_scores, normalise_rows, top_k_indices
+
+
+def _instrument_encoder(model: SentenceTransformer) -> None:
+    """
+    Record the tokenisation and transformer forward pass of every encode() call as separate stage timings
+
+    Args:
+        model (SentenceTransformer): Encoder to instrument in place
+    """
+    model.tokenize = timed("recommender.tokenize")(model.tokenize)
+    # encode() calls self.forward() directly, bypassing module hooks, so the bound method is wrapped instead
+    model.forward = timed("recommender.forward")(model.forward)
+
+
+class RecommenderState:
+    def __init__(
+        self,
+        model: SentenceTransformer,
+        model_name: str,
+        project_ids: Optional[list[int]] = None,
+        project_embeddings: Optional[np.ndarray] = None,
+        normalised_embeddings: Optional[np.ndarray] = None,
+        org_ids: Optional[list[int]] = None,
+        org_embeddings: Optional[np.ndarray] = None,
+        lexical_index: Optional[LexicalIndex] = None,
+        lexical_positions: Optional[np.ndarray] = None,
+        version: Optional[str] = None,
+    ):
+        """
+        Snapshot of everything a query reads. A Recommender replaces its snapshot as a whole and never mutates it,
+        so a query that started on one artifact version finishes on it
+
+        Args:
+            model (SentenceTransformer): Encoder of the proposals
+            model_name (str): Name of the encoder model, recorded in the artifact manifests
+            project_ids (list): list of project ids corresponding to the project embeddings
+            project_embeddings (np.ndarray): (n_projects, d) project embeddings
+            normalised_embeddings (np.ndarray): project embeddings scaled to unit norm by normalise_rows()
+            org_ids (list): list of organisation ids corresponding to the organisation embeddings
+            org_embeddings (np.ndarray): (n_organisations, d) organisation embeddings scaled to unit norm
+            lexical_index (LexicalIndex): Optional BM25 index fused with the dense results
+            lexical_positions (np.ndarray): project embedding row of every lexical index document
+            version (str): Artifact version the embeddings were loaded from, if any
+        """
+        self.model = model
+        self.model_name = model_name
+        self.project_ids = project_ids
+        self.project_embeddings = project_embeddings
+        self.normalised_embeddings = normalised_embeddings
+        self.org_ids = org_ids
+        self.org_embeddings = org_embeddings
+        self.lexical_index = lexical_index
+        self.lexical_positions = lexical_positions
+        self.version = version
+
+    def projects(self) -> tuple[list[int], np.ndarray]:
+        """
+        Project ids and unit-norm project embeddings a query is scored against
+
+        Raises:
+            ValueError: if no project embeddings were loaded or obtained from the train method
+        """
+        if self.project_ids is None or self.normalised_embeddings is None:
+            raise ValueError("No project embeddings for recommendation, load them or obtain them from the train method")
+        return self.project_ids, self.normalised_embeddings
+
+    def organisations(self) -> tuple[list[int], np.ndarray]:
+        """
+        Organisation ids and unit-norm organisation embeddings a query is scored against
+
+        Raises:
+            ValueError: if no organisation embeddings were loaded
+        """
+        if self.org_ids is None or self.org_embeddings is None:
+            raise ValueError("No organisation embeddings, load them with load_pretrained_organisation_embeddings")
+        return self.org_ids, self.org_embeddings
 
 
 class Recommender:
-    def __init__(self):
+    def __init__(self, backend: str = ENCODER_BACKEND):
         """
         Initialise recommender object
+
+        Args:
+            backend (str): CPU inference backend of the encoder, see recommender.backends.ENCODER_BACKENDS
         """
-        self.model = SentenceTransformer(EMBEDDING_MODEL_NAME)
-        self.project_ids = None
-        self._project_embeddings = None
+        self.backend = backend
+        self._state = RecommenderState(self.load_encoder(EMBEDDING_MODEL_NAME), EMBEDDING_MODEL_NAME)
+        # Serialises writers only, queries read self._state once without locking
+        self._swap_lock = threading.Lock()
+
+    @property
+    def model(self) -> SentenceTransformer:
+        return self._state.model
+
+    @property
+    def model_name(self) -> str:
+        return self._state.model_name
+
+    @property
+    def project_ids(self) -> Optional[list[int]]:
+        return self._state.project_ids
+
+    @property
+    def org_ids(self) -> Optional[list[int]]:
+        return self._state.org_ids
+
+    @property
+    def org_embeddings(self) -> Optional[np.ndarray]:
+        return self._state.org_embeddings
+
+    @property
+    def lexical_index(self) -> Optional[LexicalIndex]:
+        return self._state.lexical_index
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._state.version
 
     @property
     def project_embeddings(self) -> np.ndarray:
         """
         Encapsulated property method to access project embeddings
+
+        Raises:
+            ValueError: if no project embeddings were loaded or obtained from the train method
+        """
+        if self._state.project_embeddings is None:
+            raise ValueError("There is no project embeddings. Embeddings must be loaded or obtained from train method")
+        return self._state.project_embeddings
+
+    def load_encoder(self, model_name: str) -> SentenceTransformer:
+        """
+        Load and instrument an encoder with this recommender's backend
+
+        Args:
+            model_name (str): Name of the sentence transformer model
+
+        Returns:
+            SentenceTransformer: encoder ready for a RecommenderState
+        """
+        model = load_encoder(self.backend, model_name=model_name)
+        _instrument_encoder(model)
+        return model
+
+    def swap_state(self, state: RecommenderState) -> RecommenderState:
+        """
+        Atomically replace the state read by new queries, queries in flight finish on the previous state
+
+        Args:
+            state (RecommenderState): Fully loaded state
+
+        Returns:
+            RecommenderState: the previous state
+        """
+        with self._swap_lock:
+            previous, self._state = self._state, state
+        return previous
+
+    def _update_state(self, **changes) -> None:
+        """
+        Swap in a copy of the current state with some attributes replaced
         """
-        if self._project_embeddings is None:
-            logger.error("There is no project embeddings. Embeddings must be loaded or obtained from train method")
-        return self._project_embeddings
+        with self._swap_lock:
+            self._state = RecommenderState(**{**vars(self._state), **changes})
 
     def load_pretrained_project_embeddings(self, project_ids: list[int], project_embeddings_path: str):
         """
@@ -33,8 +186,60 @@ class Recommender:
             project_embeddings_path (str): file path string of the project embeddings numpy binary
 
         """
-        self.project_ids = project_ids
-        self._project_embeddings = np.load(project_embeddings_path)
+        project_embeddings = np.load(project_embeddings_path)
+        self._update_state(
+            project_ids=project_ids,
+            project_embeddings=project_embeddings,
+            normalised_embeddings=normalise_rows(project_embeddings),
+            lexical_positions=self._lexical_positions(self._state.lexical_index, project_ids),
+        )
+
+    def load_pretrained_organisation_embeddings(self, org_ids: list[int], org_embeddings_path: str):
+        """
+        load organisation embeddings built by build_organisation_embeddings() as numpy binary (.npy)
+
+        Args:
+            org_ids (list): list of organisation ids corresponding to organisation embeddings in the numpy binary
+            org_embeddings_path (str): file path string of the organisation embeddings numpy binary
+        """
+        self._update_state(org_ids=org_ids, org_embeddings=normalise_rows(np.load(org_embeddings_path)))
+
+    def load_lexical_index(self, index_path: str):
+        """
+        load a BM25 index built by build_bm25_index(), whose results are then fused with the dense results
+        by reciprocal-rank fusion
+
+        Args:
+            index_path (str): file path string of the index archive (.npz)
+        """
+        lexical_index = LexicalIndex(index_path)
+        self._update_state(
+            lexical_index=lexical_index,
+            lexical_positions=self._lexical_positions(lexical_index, self._state.project_ids),
+        )
+
+    @staticmethod
+    def _lexical_positions(lexical_index: Optional[LexicalIndex], project_ids: Optional[list[int]]):
+        """
+        Embedding rows of the lexical index documents, None until both are loaded
+        """
+        if lexical_index is None or project_ids is None:
+            return None
+        return align_positions(lexical_index.project_ids, project_ids)
+
+    def _rank(self, state: RecommenderState, proposal_text: str, sims: np.ndarray, top_n: int) -> np.ndarray:
+        """
+        Embedding rows of the top-N projects of one proposal: the dense ranking alone, or fused with the
+        lexical ranking by reciprocal-rank fusion when a lexical index is loaded
+        """
+        if state.lexical_index is None or state.lexical_positions is None:
+            return top_k_indices(sims[np.newaxis, :], top_n)[0]
+
+        dense = top_k_indices(sims[np.newaxis, :], max(top_n, RRF_DEPTH))[0]
+        with timed("recommender.lexical"):
+            docs, _ = state.lexical_index.search(proposal_text, max(top_n, RRF_DEPTH))
+        lexical = state.lexical_positions[docs]
+        return reciprocal_rank_fusion([dense, lexical[lexical >= 0]], top_n)
 
     def train(self, project_ids: list[int], project_objectives: list[str]):
         """
@@ -44,13 +249,20 @@ class Recommender:
             project_ids (list): list of project ids corresponding to project_objectives list
             project_objects: list of project objective strings in the order of the supplied project_ids
         """
-        self.project_ids = project_ids
-        self._project_embeddings = self.model.encode(project_objectives, show_progress_bar=True)
+        with timed("recommender.train"):
+            project_embeddings = self.model.encode(project_objectives, show_progress_bar=True)
+        self._update_state(
+            project_ids=project_ids,
+            project_embeddings=project_embeddings,
+            normalised_embeddings=normalise_rows(project_embeddings),
+            lexical_positions=self._lexical_positions(self._state.lexical_index, project_ids),
+        )
 
     def get_top_matches(self, proposal_text: str, top_n: int = 10) -> list[tuple[int, float]]:
         """
         Given a research proposal, return a list of (projectID, similarity score) tuple
-        for the top-N most similar Horizon projects.
+        for the top-N most similar Horizon projects. When a lexical index is loaded, the dense ranking is
+        fused with the BM25 ranking, the returned score stays the cosine similarity.
 
         Args:
             proposal_text (str): String of the research proposal
@@ -59,13 +271,119 @@ class Recommender:
         Return:
             list of tuples containing the most similar projects' ids and cosine similarity score
         """
-        if self._project_embeddings is None:
-            logger.error("No project embeddings for recommendation, loaded or obtained embeddings from train method")
+        state = self._state
+        project_ids, embeddings = state.projects()
 
-        input_vec = self.model.encode([proposal_text])
-        sims = cosine_similarity(input_vec, self._project_embeddings)[0]
+        METRICS.increment("recommender.queries")
+        profile = PROFILER.profile("recommender.get_top_matches", proposal_length=len(proposal_text), top_n=top_n)
+        with profile, timed("recommender.get_top_matches"):
+            with timed("recommender.encode"):
+                input_vec = state.model.encode([proposal_text])
+            with timed("recommender.similarity"):
+                sims = cosine_scores(input_vec, embeddings)
 
-        top_indices = np.argsort(sims)[::-1][:top_n]
-        top_project_ids = [(self.project_ids[i], float(sims[i])) for i in top_indices]
+            with timed("recommender.top_k"):
+                top_indices = self._rank(state, proposal_text, sims[0], top_n)
+                top_project_ids = [(project_ids[i], float(sims[0, i])) for i in top_indices]
 
         return top_project_ids
+
+    def search_pages(self, proposal_text: str) -> MatchCursor:
+        """
+        Given a research proposal, open a cursor over all Horizon projects ranked by similarity, for paging
+        through the matches with MatchCursor.next_page(). The proposal is encoded and scored once; when a lexical
+        index is loaded, the first RRF_DEPTH projects follow the fused ranking of get_top_matches(), the others
+        follow by cosine similarity
+
+        Args:
+            proposal_text (str): String of the research proposal
+
+        Return:
+            MatchCursor: cursor before the first match
+        """
+        state = self._state
+        project_ids, embeddings = state.projects()
+
+        METRICS.increment("recommender.queries")
+        profile = PROFILER.profile("recommender.search_pages", proposal_length=len(proposal_text))
+        with profile, timed("recommender.search_pages"):
+            with timed("recommender.encode"):
+                input_vec = state.model.encode([proposal_text])
+            with timed("recommender.similarity"):
+                sims = cosine_scores(input_vec, embeddings)[0]
+
+            head = None
+            if state.lexical_positions is not None:
+                with timed("recommender.top_k"):
+                    head = self._rank(state, proposal_text, sims, RRF_DEPTH)
+
+        return MatchCursor(project_ids, input_vec[0], sims, head)
+
+    def get_top_matches_batch(
+        self, proposal_texts: list[str], top_n: int = 10, batch_size: int = 32
+    ) -> list[list[tuple[int, float]]]:
+        """
+        Given a batch of research proposals, return the top-N most similar Horizon projects of each,
+        encoding the proposals together instead of one by one.
+
+        Args:
+            proposal_texts (list): list of research proposal strings
+            top_n (int): Number of most similar projects to return per proposal
+            batch_size (int): Number of proposals per encoder forward pass
+
+        Return:
+            list with, for each proposal, a list of (projectID, cosine similarity score) tuples
+        """
+        state = self._state
+        project_ids, embeddings = state.projects()
+
+        METRICS.increment("recommender.queries", len(proposal_texts))
+        with timed("recommender.get_top_matches_batch"):
+            with timed("recommender.encode"):
+                input_vecs = state.model.encode(proposal_texts, batch_size=batch_size)
+            with timed("recommender.similarity"):
+                sims = cosine_scores(input_vecs, embeddings)
+
+            with timed("recommender.top_k"):
+                top_indices: Union[np.ndarray, list[np.ndarray]]
+                if state.lexical_positions is None:
+                    top_indices = top_k_indices(sims, top_n)
+                else:
+                    top_indices = [
+                        self._rank(state, text, row_sims, top_n) for text, row_sims in zip(proposal_texts, sims)
+                    ]
+                top_project_ids = [
+                    [(project_ids[i], float(row_sims[i])) for i in row_indices]
+                    for row_indices, row_sims in zip(top_indices, sims)
+                ]
+
+        return top_project_ids
+
+    def get_top_organisations(
+        self, proposal_text: str, top_n: int = 10, query_embedding: Optional[np.ndarray] = None
+    ) -> list[tuple[int, float]]:
+        """
+        Given a research proposal, return a list of (organisationID, similarity score) tuple
+        for the top-N organisations whose project portfolio is most similar.
+
+        Args:
+            proposal_text (str): String of the research proposal
+            top_n (int): Number of most similar organisations to return
+            query_embedding (np.ndarray): Embedding of the proposal if already encoded, e.g.
+                MatchCursor.query_embedding, so the proposal is not encoded again
+
+        Return:
+            list of tuples containing the most similar organisations' ids and cosine similarity score
+        """
+        state = self._state
+        org_ids, org_embeddings = state.organisations()
+
+        with timed("recommender.get_top_organisations"):
+            if query_embedding is None:
+                input_vec = state.model.encode([proposal_text])
+            else:
+                input_vec = np.atleast_2d(query_embedding)
+            sims = cosine_scores(input_vec, org_embeddings)
+            top_indices = top_k_indices(sims, top_n)[0]
+
+        return [(org_ids[i], float(sims[0, i])) for i in top_indices]
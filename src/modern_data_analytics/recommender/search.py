@@ -0,0 +1,51 @@
+import numpy as np
+
+
+def normalise_rows(matrix: np.ndarray) -> np.ndarray:
+    """
+    Scale every row of an embedding matrix to unit L2 norm, so cosine similarity becomes a dot product
+
+    Args:
+        matrix (np.ndarray): (n, d) embedding matrix
+
+    Returns:
+        np.ndarray: float32 matrix with unit-norm rows, all-zero rows are left at zero
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def cosine_scores(query_vecs: np.ndarray, normalised_matrix: np.ndarray) -> np.ndarray:
+    """
+    Cosine similarity of each query against every row of a pre-normalised matrix
+
+    Args:
+        query_vecs (np.ndarray): (q, d) query embeddings
+        normalised_matrix (np.ndarray): (n, d) result of normalise_rows()
+
+    Returns:
+        np.ndarray: (q, n) cosine similarities
+    """
+    return normalise_rows(query_vecs) @ normalised_matrix.T
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores of each row in descending order, selecting with argpartition
+    before sorting only the k selected scores
+
+    Args:
+        scores (np.ndarray): (q, n) scores
+        k (int): Number of indices per row
+
+    Returns:
+        np.ndarray: (q, min(k, n)) indices
+    """
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.intp)
+
+    candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, candidates, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=1)
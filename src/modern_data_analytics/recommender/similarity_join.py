@@ -0,0 +1,170 @@
+import argparse
+import os
+import pickle
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from modern_data_analytics.constants import PROJECT_ID, SIMILARITY
+from modern_data_analytics.instrumentation import METRICS, timed
+from modern_data_analytics.recommender.search import normalise_rows, top_k_indices
+
+SIMILAR_PROJECT_ID = "similar_projectID"
+
+
+def _part_path(output_dir: str, tile: int) -> str:
+    return os.path.join(output_dir, f"part-{tile:06d}.parquet")
+
+
+def join_tile(
+    normalised: np.ndarray, row_start: int, tile_size: int, threshold: Optional[float], top_k: Optional[int]
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Find the similar pairs of one tile of rows, scoring it against the matrix one column tile at a time so
+    at most tile_size x tile_size scores are held in memory
+
+    With top_k, every row keeps its k most similar other rows, optionally above the threshold, so a pair can
+    appear in both directions. With the threshold only, each pair above it is kept once, from the lower row
+
+    Args:
+        normalised (np.ndarray): (n, d) embeddings scaled to unit norm
+        row_start (int): First row of the tile
+        tile_size (int): Number of rows and columns per tile
+        threshold (float): Minimum cosine similarity of a kept pair
+        top_k (int): Number of most similar rows kept per row
+
+    Returns:
+        tuple: row indices, column indices and cosine similarities of the kept pairs
+    """
+    n = normalised.shape[0]
+    rows = np.arange(row_start, min(row_start + tile_size, n))
+    row_vecs = normalised[rows]
+
+    if top_k is not None:
+        best_cols: np.ndarray = np.empty((len(rows), 0), dtype=np.int64)
+        best_sims: np.ndarray = np.empty((len(rows), 0), dtype=np.float32)
+        for col_start in range(0, n, tile_size):
+            sims = row_vecs @ normalised[col_start : col_start + tile_size].T
+            # Exclude each row's similarity with itself
+            own = (rows >= col_start) & (rows < col_start + sims.shape[1])
+            sims[np.flatnonzero(own), rows[own] - col_start] = -np.inf
+
+            # Merge the top-k of the tile into the running top-k of every row
+            tile_best = top_k_indices(sims, top_k)
+            candidate_sims = np.concatenate([best_sims, np.take_along_axis(sims, tile_best, axis=1)], axis=1)
+            candidate_cols = np.concatenate([best_cols, col_start + tile_best], axis=1)
+            keep = top_k_indices(candidate_sims, top_k)
+            best_sims = np.take_along_axis(candidate_sims, keep, axis=1)
+            best_cols = np.take_along_axis(candidate_cols, keep, axis=1)
+
+        mask = np.isfinite(best_sims) if threshold is None else best_sims >= threshold
+        row_index = np.broadcast_to(rows[:, np.newaxis], best_cols.shape)
+        return row_index[mask], best_cols[mask], best_sims[mask]
+
+    found_rows, found_cols, found_sims = [], [], []
+    # Only columns from the tile's first row on, the pairs of earlier columns belong to earlier tiles
+    for col_start in range(row_start, n, tile_size):
+        sims = row_vecs @ normalised[col_start : col_start + tile_size].T
+        tile_rows, tile_cols = np.nonzero(sims >= threshold)
+        pair_rows, pair_cols = rows[tile_rows], col_start + tile_cols
+        upper = pair_cols > pair_rows
+        found_rows.append(pair_rows[upper])
+        found_cols.append(pair_cols[upper])
+        found_sims.append(sims[tile_rows[upper], tile_cols[upper]])
+    return np.concatenate(found_rows), np.concatenate(found_cols), np.concatenate(found_sims)
+
+
+def similarity_join(
+    project_ids: list[int],
+    embeddings: np.ndarray,
+    output_dir: str,
+    threshold: Optional[float] = None,
+    top_k: Optional[int] = None,
+    tile_size: int = 4096,
+    n_workers: int = 2,
+) -> int:
+    """
+    All-pairs cosine similarity self-join of the project embeddings, processed in tiles of rows by a thread
+    pool so the N x N similarity matrix is never materialised. The kept pairs of each row tile are written
+    as a Parquet part file of the edge list (projectID, similar_projectID, similarity)
+
+    Args:
+        project_ids (list): Project ids of the embedding rows
+        embeddings (np.ndarray): (n, d) project embeddings, e.g. Recommender.project_embeddings
+        output_dir (str): Directory to write the Parquet part files into
+        threshold (float): Minimum cosine similarity of a kept pair, e.g. 0.95 for near-duplicates
+        top_k (int): Number of most similar projects kept per project
+        tile_size (int): Number of rows and columns per tile, bounding memory to about
+            n_workers x tile_size x tile_size float32 scores
+        n_workers (int): Number of row tiles joined concurrently, matrix products release the GIL
+
+    Returns:
+        int: number of edges written
+    """
+    if threshold is None and top_k is None:
+        raise ValueError("Give a similarity threshold, a top_k or both")
+
+    os.makedirs(output_dir, exist_ok=True)
+    ids = np.asarray(project_ids)
+    normalised = normalise_rows(embeddings)
+    n = normalised.shape[0]
+    row_starts = range(0, n, tile_size)
+
+    def process(tile: int, row_start: int) -> tuple[int, int]:
+        with timed("similarity_join.tile"):
+            rows, cols, sims = join_tile(normalised, row_start, tile_size, threshold, top_k)
+            edges = pd.DataFrame({PROJECT_ID: ids[rows], SIMILAR_PROJECT_ID: ids[cols], SIMILARITY: sims})
+            part_path = _part_path(output_dir, tile)
+            edges.to_parquet(part_path + ".tmp", index=False)
+            os.replace(part_path + ".tmp", part_path)
+        compared = (min(row_start + tile_size, n) - row_start) * (n if top_k is not None else n - row_start)
+        return compared, len(edges)
+
+    start = time.perf_counter()
+    total_compared, total_edges = 0, 0
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        futures = [executor.submit(process, tile, row_start) for tile, row_start in enumerate(row_starts)]
+        for done, future in enumerate(as_completed(futures), start=1):
+            compared, n_edges = future.result()
+            total_compared += compared
+            total_edges += n_edges
+            METRICS.increment("similarity_join.pairs", compared)
+            elapsed = time.perf_counter() - start
+            logger.info(
+                f"{done}/{len(futures)} tiles, {total_edges} edges, {total_compared / elapsed / 1e6:.1f}M pairs/s"
+            )
+
+    logger.info(f"{total_edges} similar pairs of {n} projects saved to: {output_dir}")
+    return total_edges
+
+
+def cli() -> None:
+    """
+    Command-line entry point of the project similarity join
+    """
+    parser = argparse.ArgumentParser(description="Find similar and near-duplicate projects by embedding similarity")
+    parser.add_argument("output_dir", help="directory for the Parquet part files of the edge list")
+    parser.add_argument("--project-ids-path", default="models/project_ids.pkl")
+    parser.add_argument("--project-embeddings-path", default="models/project_embeddings.npy")
+    parser.add_argument("--threshold", type=float, help="minimum cosine similarity of a kept pair")
+    parser.add_argument("--top-k", type=int, help="number of most similar projects kept per project")
+    parser.add_argument("--tile-size", type=int, default=4096)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    with open(args.project_ids_path, "rb") as f:
+        project_ids = pickle.load(f)
+    similarity_join(
+        project_ids=project_ids,
+        embeddings=np.load(args.project_embeddings_path),
+        output_dir=args.output_dir,
+        threshold=args.threshold,
+        top_k=args.top_k,
+        tile_size=args.tile_size,
+        n_workers=args.workers,
+    )
+    METRICS.log_summary()
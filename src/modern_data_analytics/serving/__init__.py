@@ -0,0 +1,10 @@
+from modern_data_analytics.serving.cache import SessionCache as SessionCache
+from modern_data_analytics.serving.maps import PartnerMap as PartnerMap
+from modern_data_analytics.serving.maps import build_marker as build_marker
+from modern_data_analytics.serving.maps import build_marker_layer as build_marker_layer
+from modern_data_analytics.serving.maps import build_partner_layer as build_partner_layer
+from modern_data_analytics.serving.maps import close_layer as close_layer
+from modern_data_analytics.serving.stats import MatchSetStats as MatchSetStats
+from modern_data_analytics.serving.tables import TextStore as TextStore
+from modern_data_analytics.serving.tables import build_serving_tables as build_serving_tables
+from modern_data_analytics.serving.tables import load_serving_tables as load_serving_tables
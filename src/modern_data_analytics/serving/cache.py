@@ -0,0 +1,59 @@
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class SessionCache:
+    def __init__(self, maxsize: int, on_evict: Optional[Callable[[Any], None]] = None):
+        """
+        Initialise a bounded least-recently-used cache for derived views of a single app session
+
+        Args:
+            maxsize (int): Maximum number of entries kept before the least recently used one is evicted
+            on_evict (callable): Optional callback receiving each evicted value, e.g. to close widgets
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+
+        self.maxsize = maxsize
+        self.on_evict = on_evict
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for key, computing and storing it on a miss
+
+        Args:
+            key (Hashable): Cache key, e.g. (match-set version, view name, acronym)
+            compute (callable): Zero-argument function producing the value on a miss
+
+        Returns:
+            The cached or freshly computed value
+        """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        value = compute()
+        self._entries[key] = value
+
+        while len(self._entries) > self.maxsize:
+            _, evicted = self._entries.popitem(last=False)
+            if self.on_evict is not None:
+                self.on_evict(evicted)
+
+        return value
+
+    def clear(self) -> None:
+        """
+        Drop every entry, passing each value to the eviction callback
+        """
+        while self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            if self.on_evict is not None:
+                self.on_evict(evicted)
@@ -0,0 +1,197 @@
+from typing import Optional
+
+import pandas as pd
+from ipyleaflet import GeoJSON, Icon, LayerGroup, Map, Marker, MarkerCluster
+from ipywidgets import HTML
+
+from modern_data_analytics.config import MAP_CLUSTER_THRESHOLD, MAP_GEOJSON_THRESHOLD
+from modern_data_analytics.constants import COORDINATOR, LATITUDE, LONGITUDE, NAME, ROLE
+
+COORDINATOR_ICON_URL = (
+    "https://raw.githubusercontent.com/pointhi/leaflet-color-markers/master/img/marker-icon-2x-green.png"
+)
+
+
+class PartnerMap:
+    def __init__(self, center: tuple[float, float] = (50, 10), zoom: int = 4):
+        """
+        Initialise a reusable map widget whose partner layer is swapped in place
+
+        Args:
+            center (tuple): Default (latitude, longitude) centre of the map
+            zoom (int): Default zoom level of the map
+        """
+        self.default_center = center
+        self.default_zoom = zoom
+        self.widget = Map(center=center, zoom=zoom)
+        self._layer: Optional[LayerGroup | GeoJSON] = None
+        # Whether the displayed layer was released while shown, so it is closed once replaced
+        self._release_on_replace = False
+
+    def show(
+        self,
+        layer: Optional[LayerGroup | GeoJSON],
+        center: Optional[tuple[float, float]] = None,
+        zoom: Optional[int] = None,
+    ) -> None:
+        """
+        Replace the displayed partner layer, keeping the same Map instance
+
+        Args:
+            layer: Layer from build_partner_layer() or build_marker_layer(), or None to clear the map
+            center (tuple): Optional new centre, defaults to the map's default centre
+            zoom (int): Optional new zoom level, defaults to the map's default zoom
+        """
+        if layer is not self._layer:
+            previous = self._layer
+            if previous is not None and previous in self.widget.layers:
+                self.widget.remove(previous)
+            if layer is not None:
+                self.widget.add(layer)
+            self._layer = layer
+            if self._release_on_replace:
+                self._release_on_replace = False
+                close_layer(previous)
+
+        self.widget.center = center if center is not None else self.default_center
+        self.widget.zoom = zoom if zoom is not None else self.default_zoom
+
+    def release(self, layer: Optional[LayerGroup | GeoJSON]) -> None:
+        """
+        Close a layer this map no longer needs, e.g. as the on_evict callback of the map's layer cache.
+        The displayed layer is only closed once show() replaces it
+
+        Args:
+            layer: Layer from build_partner_layer() or build_marker_layer()
+        """
+        if layer is None:
+            return
+        if layer is self._layer:
+            self._release_on_replace = True
+        else:
+            close_layer(layer)
+
+
+def build_marker(location: tuple[float, float], title: str, popup_html: str, icon: Optional[Icon] = None) -> Marker:
+    """
+    Build a single non-draggable marker with an HTML popup
+
+    Args:
+        location (tuple): (latitude, longitude) of the marker
+        title (str): Hover title of the marker
+        popup_html (str): HTML content of the marker popup
+        icon (Icon): Optional icon, defaults to the standard leaflet marker
+
+    Returns:
+        Marker: ipyleaflet marker
+    """
+    marker = Marker(location=location, title=title, draggable=False)
+    if icon is not None:
+        marker.icon = icon
+    marker.popup = HTML(popup_html)
+    return marker
+
+
+def build_marker_layer(markers: list[Marker]) -> LayerGroup:
+    """
+    Wrap markers in a layer group so they can be shown or hidden as one layer
+
+    Args:
+        markers (list): list of markers
+
+    Returns:
+        LayerGroup: layer containing the markers
+    """
+    return LayerGroup(layers=tuple(markers))
+
+
+def build_partner_layer(orgs: pd.DataFrame) -> Optional[LayerGroup | GeoJSON]:
+    """
+    Build a single layer for project partners, choosing the representation by partner count:
+    plain markers for small consortia, a MarkerCluster for larger ones and one GeoJSON layer
+    above MAP_GEOJSON_THRESHOLD so the widget payload stays flat
+
+    Args:
+        orgs (pd.DataFrame): Organisations with name, role, latitude and longitude columns
+
+    Returns:
+        Layer to pass to PartnerMap.show(), or None if no organisation has a location
+    """
+    if orgs.empty:
+        return None
+
+    located = orgs.dropna(subset=[LATITUDE, LONGITUDE])
+    if located.empty:
+        return None
+
+    if len(located) > MAP_GEOJSON_THRESHOLD:
+        return _build_geojson_layer(located)
+
+    icon = Icon(icon_url=COORDINATOR_ICON_URL, icon_size=[25, 41], icon_anchor=[12, 41])
+    markers = [
+        build_marker(
+            location=(lat, lon),
+            title=f"{name} ({role})",
+            popup_html=f"<strong>{name}</strong><br>{role}",
+            icon=icon if role == COORDINATOR else None,
+        )
+        for name, role, lat, lon in zip(located[NAME], located[ROLE], located[LATITUDE], located[LONGITUDE])
+    ]
+
+    if len(markers) > MAP_CLUSTER_THRESHOLD:
+        return MarkerCluster(markers=tuple(markers))
+    return build_marker_layer(markers)
+
+
+def _build_geojson_layer(orgs: pd.DataFrame) -> GeoJSON:
+    """
+    Build one GeoJSON point layer for a large set of organisations, coordinators drawn in green
+
+    Args:
+        orgs (pd.DataFrame): Located organisations with name, role, latitude and longitude columns
+
+    Returns:
+        GeoJSON: layer with one point feature per organisation
+    """
+    features = [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [float(lon), float(lat)]},
+            "properties": {NAME: str(name), ROLE: str(role)},
+        }
+        for name, role, lat, lon in zip(orgs[NAME], orgs[ROLE], orgs[LATITUDE], orgs[LONGITUDE])
+    ]
+
+    def style_callback(feature: dict) -> dict:
+        colour = "green" if feature["properties"][ROLE] == COORDINATOR else "blue"
+        return {"color": colour, "fillColor": colour}
+
+    return GeoJSON(
+        data={"type": "FeatureCollection", "features": features},
+        point_style={"radius": 5, "weight": 1, "fillOpacity": 0.7},
+        style_callback=style_callback,
+    )
+
+
+def close_layer(layer: Optional[LayerGroup | GeoJSON]) -> None:
+    """
+    Close a partner layer and the marker widgets it holds, including their icons. build_partner_layer() creates
+    the coordinator icon for its layer only, so no other layer shares it
+
+    Args:
+        layer: Layer from build_partner_layer() or build_marker_layer()
+    """
+    if layer is None:
+        return
+
+    children = getattr(layer, "markers", ()) or getattr(layer, "layers", ())
+    icons = {}
+    for child in children:
+        if getattr(child, "popup", None) is not None:
+            child.popup.close()
+        if getattr(child, "icon", None) is not None:
+            icons[id(child.icon)] = child.icon
+        child.close()
+    for icon in icons.values():
+        icon.close()
+    layer.close()
@@ -0,0 +1,128 @@
+import numpy as np
+
+from modern_data_analytics.constants import COUNTRY, EC_MAX_CONTRIBUTION, FUNDING_ID, N_ORGANISATIONS, TITLE_TOPIC
+
+START_YEAR = "start_year"
+DEFAULT_QUANTILES = (0.25, 0.5, 0.75)
+
+
+class MatchSetStats:
+    def __init__(self, cube_path: str):
+        """
+        Load the project feature cube written by save_project_feature_cube() to compute match-set statistics
+        with integer code counting and fancy indexing instead of per-request pandas
+
+        Args:
+            cube_path (str): Path of the feature cube archive (.npz)
+        """
+        with np.load(cube_path) as cube:
+            self._sorted_project_ids = cube["sorted_project_ids"]
+            self._sorted_positions = cube["sorted_positions"]
+            self._numeric = {
+                N_ORGANISATIONS: cube[N_ORGANISATIONS],
+                EC_MAX_CONTRIBUTION: cube[EC_MAX_CONTRIBUTION],
+            }
+            self._codes = {
+                FUNDING_ID: cube[f"{FUNDING_ID}_codes"],
+                TITLE_TOPIC: cube[f"{TITLE_TOPIC}_codes"],
+            }
+            self._vocabularies = {
+                FUNDING_ID: cube[f"{FUNDING_ID}_vocabulary"],
+                TITLE_TOPIC: cube[f"{TITLE_TOPIC}_vocabulary"],
+                COUNTRY: cube["country_vocabulary"],
+            }
+            self._country_offsets = cube["country_offsets"]
+            self._country_codes = cube["country_codes"]
+
+            # Start years become codes relative to the first year, missing years stay -1
+            years = cube[START_YEAR].astype(np.int32)
+            first_year = years[years >= 0].min() if (years >= 0).any() else 0
+            self._codes[START_YEAR] = np.where(years >= 0, years - first_year, -1)
+            self._vocabularies[START_YEAR] = np.arange(first_year, years.max() + 1)
+
+    def positions(self, project_ids) -> np.ndarray:
+        """
+        Map project ids to their positions in the feature arrays with a binary search, dropping unknown ids
+
+        Args:
+            project_ids: Sequence of project ids
+
+        Returns:
+            np.ndarray: positions of the known projects
+        """
+        project_ids = np.asarray(project_ids, dtype=np.int64)
+        found = np.minimum(np.searchsorted(self._sorted_project_ids, project_ids), len(self._sorted_project_ids) - 1)
+        known = self._sorted_project_ids[found] == project_ids
+        return self._sorted_positions[found[known]]
+
+    def category_counts(self, column: str, positions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Count the projects of each category among the given positions
+
+        Args:
+            column (str): "funding_id", "title_topic", "start_year" or "country"
+            positions (np.ndarray): Result of positions()
+
+        Returns:
+            tuple: labels and counts of the categories present, in descending count order
+        """
+        if column == COUNTRY:
+            codes = self._gather_countries(positions)
+        else:
+            codes = self._codes[column][positions]
+        codes = codes[codes >= 0]
+
+        vocabulary = self._vocabularies[column]
+        counts = np.bincount(codes, minlength=len(vocabulary))
+        present = np.flatnonzero(counts)
+        present = present[np.argsort(-counts[present], kind="stable")]
+        return vocabulary[present], counts[present]
+
+    def quantiles(self, column: str, positions: np.ndarray, q: tuple[float, ...] = DEFAULT_QUANTILES) -> np.ndarray:
+        """
+        Quantiles of a numeric feature among the given positions, ignoring missing values
+
+        Args:
+            column (str): "n_organisations" or "ecMaxContribution"
+            positions (np.ndarray): Result of positions()
+            q (tuple): Quantiles to compute
+
+        Returns:
+            np.ndarray: one value per quantile, NaN if no value is available
+        """
+        values = self._numeric[column][positions]
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return np.full(len(q), np.nan)
+        return np.quantile(values, q)
+
+    def summarise(self, project_ids) -> dict:
+        """
+        Compute the category counts and numeric quantiles of a match set
+
+        Args:
+            project_ids: Sequence of matched project ids
+
+        Returns:
+            dict: (labels, counts) per categorical column and quantiles per numeric column
+        """
+        positions = self.positions(project_ids)
+        summary: dict = {"n_projects": len(positions)}
+        for column in [FUNDING_ID, TITLE_TOPIC, START_YEAR, COUNTRY]:
+            summary[column] = self.category_counts(column, positions)
+        for column in [N_ORGANISATIONS, EC_MAX_CONTRIBUTION]:
+            summary[column] = self.quantiles(column, positions)
+        return summary
+
+    def _gather_countries(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Concatenate the country codes of the given projects from the CSR arrays without a Python loop
+        """
+        starts = self._country_offsets[positions]
+        lengths = self._country_offsets[positions + 1] - starts
+        if lengths.sum() == 0:
+            return np.empty(0, dtype=self._country_codes.dtype)
+
+        segment_starts = np.cumsum(lengths) - lengths
+        index = np.arange(lengths.sum()) - np.repeat(segment_starts - starts, lengths)
+        return self._country_codes[index]
@@ -0,0 +1,269 @@
+import argparse
+import os
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from loguru import logger
+
+from modern_data_analytics.constants import (
+    ACRONYM,
+    ASSOCIATED_PARTNER,
+    AVG_ANNUAL_FUNDING_PER_PARTICIPANT,
+    CITY,
+    COORDINATOR,
+    CORDIS_FUNDING_URL,
+    CORDIS_PROJECT_URL,
+    COUNTRY,
+    EC_MAX_CONTRIBUTION,
+    FUNDING_ID,
+    LATITUDE,
+    LONGITUDE,
+    N_PROJECTS,
+    NAME,
+    OBJECTIVE,
+    ORGANISATION_ID,
+    ORGANIZATION_URL,
+    PARTICIPANT,
+    PROJECT_ID,
+    THIRD_PARTY,
+    TITLE,
+    TITLE_TOPIC,
+    TOPIC_OBJECTIVE,
+    TOTAL_COST,
+)
+
+ARROW_STRING = "string[pyarrow]"
+
+# Columns kept in memory by the app and their serving dtypes
+SERVING_PROJECT_DTYPES = {
+    PROJECT_ID: "int64",
+    ACRONYM: ARROW_STRING,
+    TITLE: ARROW_STRING,
+    CORDIS_PROJECT_URL: ARROW_STRING,
+    EC_MAX_CONTRIBUTION: "float64",
+    AVG_ANNUAL_FUNDING_PER_PARTICIPANT: "float64",
+    FUNDING_ID: "category",
+    TITLE_TOPIC: "category",
+    CORDIS_FUNDING_URL: "category",
+    COORDINATOR: ARROW_STRING,
+    PARTICIPANT: ARROW_STRING,
+    THIRD_PARTY: ARROW_STRING,
+    ASSOCIATED_PARTNER: ARROW_STRING,
+}
+
+SERVING_ORG_DTYPES = {
+    ORGANISATION_ID: "int64",
+    NAME: ARROW_STRING,
+    COUNTRY: "category",
+    CITY: "category",
+    LATITUDE: "float64",
+    LONGITUDE: "float64",
+    ORGANIZATION_URL: ARROW_STRING,
+    N_PROJECTS: "int32",
+    TOTAL_COST: "float64",
+}
+
+PROJECTS_FILE = "projects.parquet"
+ORGANISATIONS_FILE = "organisations.parquet"
+
+
+class TextStore:
+    def __init__(self, path_prefix: str):
+        """
+        Open an on-disk text store written by TextStore.build(). Keys and offsets are held in memory,
+        the text blob is memory-mapped and only the requested slices are decoded
+
+        Args:
+            path_prefix (str): Path prefix of the store files, e.g. "data/serving/objective"
+        """
+        self.keys = np.load(f"{path_prefix}_keys.npy")
+        self.offsets = np.load(f"{path_prefix}_offsets.npy")
+        self._blob: np.ndarray
+        if self.offsets[-1] > 0:
+            self._blob = np.memmap(f"{path_prefix}.bin", dtype=np.uint8, mode="r")
+        else:
+            self._blob = np.zeros(0, dtype=np.uint8)
+
+    @staticmethod
+    def build(keys: pd.Series, texts: pd.Series, path_prefix: str) -> None:
+        """
+        Write texts to disk as one UTF-8 blob with sorted keys and byte offsets. Missing texts are skipped
+        and duplicate keys keep their first text
+
+        Args:
+            keys (pd.Series): Lookup key of each text, e.g. projectID or funding_id
+            texts (pd.Series): Text of each key in the same order
+            path_prefix (str): Path prefix of the store files
+        """
+        store = pd.DataFrame({"key": keys.to_numpy(), "text": texts.to_numpy()}).dropna()
+        store = store.drop_duplicates(subset="key").sort_values("key")
+
+        encoded = [str(text).encode("utf-8") for text in store["text"]]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(text) for text in encoded], out=offsets[1:])
+
+        key_values = store["key"].to_numpy()
+        if key_values.dtype == object:
+            key_values = key_values.astype(str)
+
+        np.save(f"{path_prefix}_keys.npy", key_values)
+        np.save(f"{path_prefix}_offsets.npy", offsets)
+        with open(f"{path_prefix}.bin", "wb") as f:
+            for text in encoded:
+                f.write(text)
+
+    def get(self, key) -> Optional[str]:
+        """
+        Fetch the text of a key
+
+        Args:
+            key: Lookup key, of the same type as the keys the store was built with
+
+        Returns:
+            str: the stored text, or None if the key has no text
+        """
+        position = int(np.searchsorted(self.keys, key))
+        if position >= len(self.keys) or self.keys[position] != key:
+            return None
+
+        start, end = self.offsets[position], self.offsets[position + 1]
+        return bytes(self._blob[start:end]).decode("utf-8")
+
+
+def slim_project_table(project_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Keep only the project columns displayed by the app, with categorical and Arrow-backed string dtypes
+
+    Args:
+        project_df (pd.DataFrame): Full preprocessed project DataFrame
+
+    Returns:
+        pd.DataFrame: slim project DataFrame
+    """
+    return project_df[list(SERVING_PROJECT_DTYPES)].astype(SERVING_PROJECT_DTYPES).reset_index(drop=True)
+
+
+def slim_org_table(org_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Keep only the organisation columns displayed by the app, with categorical and Arrow-backed string dtypes
+
+    Args:
+        org_df (pd.DataFrame): Organisation summary DataFrame with latitude and longitude columns
+
+    Returns:
+        pd.DataFrame: slim organisation DataFrame
+    """
+    return org_df[list(SERVING_ORG_DTYPES)].astype(SERVING_ORG_DTYPES).reset_index(drop=True)
+
+
+def build_serving_tables(project_df: pd.DataFrame, org_df: pd.DataFrame, output_dir: str) -> None:
+    """
+    Write the slim serving tables as Parquet and move the long objective texts to on-disk text stores:
+    project objectives keyed by projectID and funding topic objectives keyed by funding_id
+
+    Args:
+        project_df (pd.DataFrame): Full preprocessed project DataFrame
+        org_df (pd.DataFrame): Organisation summary DataFrame with latitude and longitude columns
+        output_dir (str): Directory to write the serving tables into
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    slim_projects = slim_project_table(project_df)
+    slim_orgs = slim_org_table(org_df)
+    slim_projects.to_parquet(os.path.join(output_dir, PROJECTS_FILE), index=False)
+    slim_orgs.to_parquet(os.path.join(output_dir, ORGANISATIONS_FILE), index=False)
+
+    TextStore.build(project_df[PROJECT_ID], project_df[OBJECTIVE], os.path.join(output_dir, OBJECTIVE))
+    TextStore.build(
+        project_df[FUNDING_ID].astype(str), project_df[TOPIC_OBJECTIVE], os.path.join(output_dir, TOPIC_OBJECTIVE)
+    )
+
+    log_memory_reduction("project table", project_df, slim_projects)
+    log_memory_reduction("organisation table", org_df, slim_orgs)
+    logger.info(f"Serving tables saved to: {output_dir}")
+
+
+def load_serving_tables(serving_dir: str) -> tuple[pd.DataFrame, pd.DataFrame, TextStore, TextStore]:
+    """
+    Load the serving tables and open the text stores written by build_serving_tables()
+
+    Args:
+        serving_dir (str): Directory of the serving tables
+
+    Returns:
+        tuple: project DataFrame, organisation DataFrame, objective store keyed by projectID and
+        topic objective store keyed by funding_id
+
+    Raises:
+        FileNotFoundError: if the serving tables have not been built
+    """
+    if not os.path.exists(os.path.join(serving_dir, PROJECTS_FILE)):
+        raise FileNotFoundError(
+            f"No serving tables in {serving_dir}: build them from the processed data with mda-build-serving-tables"
+        )
+    project_df = _read_parquet(os.path.join(serving_dir, PROJECTS_FILE)).astype(SERVING_PROJECT_DTYPES)
+    org_df = _read_parquet(os.path.join(serving_dir, ORGANISATIONS_FILE)).astype(SERVING_ORG_DTYPES)
+    objective_store = TextStore(os.path.join(serving_dir, OBJECTIVE))
+    topic_objective_store = TextStore(os.path.join(serving_dir, TOPIC_OBJECTIVE))
+
+    return project_df, org_df, objective_store, topic_objective_store
+
+
+def _read_parquet(path: str) -> pd.DataFrame:
+    """
+    Read a Parquet table keeping strings Arrow-backed, avoiding an intermediate copy as Python objects
+
+    Args:
+        path (str): Path of the Parquet file
+
+    Returns:
+        pd.DataFrame: DataFrame with Arrow-backed string columns
+    """
+    string_dtypes = {pa.string(): pd.StringDtype("pyarrow"), pa.large_string(): pd.StringDtype("pyarrow")}
+    return pq.read_table(path).to_pandas(types_mapper=string_dtypes.get)
+
+
+def log_memory_reduction(label: str, before: pd.DataFrame, after: pd.DataFrame) -> None:
+    """
+    Log the deep in-memory size of a table before and after slimming
+
+    Args:
+        label (str): Name of the table in the log message
+        before (pd.DataFrame): Original DataFrame
+        after (pd.DataFrame): Slim DataFrame
+    """
+    before_mb = before.memory_usage(deep=True).sum() / 1e6
+    after_mb = after.memory_usage(deep=True).sum() / 1e6
+    reduction = 100 * (1 - after_mb / before_mb) if before_mb else 0.0
+    logger.info(f"Serving {label}: {before_mb:.1f} MB -> {after_mb:.1f} MB ({reduction:.0f}% smaller)")
+
+
+def main(project_path: str, org_path: str, output_dir: str) -> None:
+    """
+    Main function to read the processed CSVs and write the serving tables
+
+    Args:
+        project_path (str): Path to the processed project CSV (project_merged.csv)
+        org_path (str): Path to the processed organisation CSV (org_unique_detailed.csv)
+        output_dir (str): Directory to write the serving tables into
+    """
+    project_df = pd.read_csv(project_path)
+    org_df = pd.read_csv(org_path)
+
+    build_serving_tables(project_df, org_df, output_dir)
+
+
+def cli() -> None:
+    """
+    Command-line entry point of the serving table build
+    """
+    parser = argparse.ArgumentParser(description="Build the slim serving tables and text stores read by the app")
+    parser.add_argument("--project-path", default="data/processed/project_merged.csv")
+    parser.add_argument("--org-path", default="data/processed/org_unique_detailed.csv")
+    parser.add_argument("--output-dir", default="data/serving")
+    args = parser.parse_args()
+
+    main(args.project_path, args.org_path, args.output_dir)
@@ -0,0 +1,59 @@
+import os
+
+import pandas as pd
+import pytest
+
+from modern_data_analytics.constants import (
+    ASSOCIATED_PARTNER,
+    COORDINATOR,
+    ORGANISATION_ID,
+    PARTICIPANT,
+    PROJECT_ID,
+    THIRD_PARTY,
+)
+from modern_data_analytics.preprocessing.utils import (
+    coparticipation_adjacency,
+    org_project_incidence,
+    save_coparticipation_graph,
+)
+from modern_data_analytics.recommender.collaborators import CollaboratorIndex
+
+PARTNER, SMALL, HUB, MATCHED = 1, 2, 3, [100, 101]
+
+
+@pytest.fixture
+def index(tmp_path) -> CollaboratorIndex:
+    # The partner coordinates the matched projects. The small organisation's 4 projects are all with the
+    # partner, the hub shares 60 of its 400 projects with it and works with 20 other organisations otherwise
+    projects: list[tuple[int, int, list[int]]] = [(pid, PARTNER, []) for pid in MATCHED]
+    projects += [(200 + i, PARTNER, [SMALL]) for i in range(4)]
+    projects += [(300 + i, PARTNER, [HUB]) for i in range(60)]
+    projects += [(1000 + i, HUB, [10 + i % 20]) for i in range(340)]
+
+    roles_df = pd.DataFrame(
+        {
+            PROJECT_ID: [pid for pid, _, _ in projects],
+            COORDINATOR: [[coordinator] for _, coordinator, _ in projects],
+            PARTICIPANT: [participants for _, _, participants in projects],
+            THIRD_PARTY: [[] for _ in projects],
+            ASSOCIATED_PARTNER: [[] for _ in projects],
+        }
+    )
+    org_df = pd.DataFrame({ORGANISATION_ID: [PARTNER, SMALL, HUB, *range(10, 30)]})
+
+    incidence, org_ids, project_ids = org_project_incidence(org_df, roles_df)
+    path = os.path.join(tmp_path, "coparticipation_graph.npz")
+    save_coparticipation_graph(path, incidence, coparticipation_adjacency(incidence), org_ids, project_ids)
+    return CollaboratorIndex(path)
+
+
+def test_small_partner_outranks_hub(index):
+    ranking = index.rank_collaborators(MATCHED).set_index(ORGANISATION_ID)
+
+    # The hub has more raw co-participation with the partner, but only a small share of its collaborations
+    assert ranking.loc[HUB, "co_participation"] > ranking.loc[SMALL, "co_participation"]
+    assert ranking.loc[SMALL, "score"] > ranking.loc[HUB, "score"]
+
+
+def test_unknown_projects_give_an_empty_ranking(index):
+    assert index.rank_collaborators([999_999]).empty
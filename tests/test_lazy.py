@@ -0,0 +1,54 @@
+import os
+
+import pandas as pd
+import pytest
+
+from benchmarks.bench_lazy import assert_backends_equivalent
+from benchmarks.synthetic import generate_raw_tables
+from modern_data_analytics.constants import N_ORGANISATIONS, PROJECT_ID, TOPIC_OBJECTIVE
+from modern_data_analytics.preprocessing.lazy import preprocess_lazy, scan_raw_tables
+from modern_data_analytics.preprocessing.main import preprocess
+
+pytest.importorskip("polars")
+
+
+@pytest.fixture
+def tables() -> dict[str, pd.DataFrame]:
+    return {f"{name}_df": df for name, df in generate_raw_tables(200, seed=7).items()}
+
+
+def run_pandas(tables: dict[str, pd.DataFrame]) -> pd.DataFrame:
+    # preprocess() casts its input tables in place
+    return preprocess(**{name: df.copy() for name, df in tables.items()})
+
+
+def test_preprocess_lazy_matches_pandas(tables):
+    assert_backends_equivalent(run_pandas(tables), preprocess_lazy(**tables))
+
+
+def test_preprocess_lazy_matches_pandas_with_missing_summaries(tables):
+    # Projects without organisations, sciVoc topics, legal basis, topic or programme take the NaN paths
+    project_ids = tables["project_df"]["id"]
+    for name, excluded in [
+        ("org_df", project_ids[:5]),
+        ("scivoc_df", project_ids[5:10]),
+        ("legal_df", project_ids[10:15]),
+        ("topics_df", project_ids[15:20]),
+    ]:
+        tables[name] = tables[name][~tables[name][PROJECT_ID].isin(excluded)]
+    tables["programme_df"] = tables["programme_df"].iloc[::2]
+
+    expected = run_pandas(tables)
+    assert expected[N_ORGANISATIONS].isna().any() and expected[TOPIC_OBJECTIVE].isna().any()
+    assert_backends_equivalent(expected, preprocess_lazy(**tables))
+
+
+def test_preprocess_lazy_matches_pandas_from_csv(tables, tmp_path):
+    paths = {}
+    for name, df in tables.items():
+        paths[name] = os.path.join(tmp_path, f"{name}.csv")
+        df.to_csv(paths[name], index=False)
+
+    expected = preprocess(**{name: pd.read_csv(path) for name, path in paths.items()})
+    actual = preprocess_lazy(**scan_raw_tables(**{name[:-3] + "_path": path for name, path in paths.items()}))
+    assert_backends_equivalent(expected, actual)